@@ -0,0 +1,188 @@
+import argparse
+import csv
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from gui_updates import UpdateChannel
+from send_engine import EngineListener
+
+# ----------------------- Benchmarks -----------------------
+# e2e: drives a real browser against the local fake WhatsApp Web (fake_whatsapp.py) with a
+#      generated contact list and reports messages/minute plus per-stage latencies, so
+#      throughput changes can be measured offline and compared between commits.
+# orchestration: the same engine on an in-process fake WebDriver (fake_webdriver.py) with
+#      zero latency and no delay, reporting rows/second of pure engine overhead (reading,
+#      validation, journal, metrics, listener updates) for 10k / 100k / 1M rows.
+
+# Smallest valid PNG (1x1, transparent) for media rows
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c63000100000500010d0a2db40000000049454e44ae426082")
+
+def generate_contacts(path, rows, media_share=0.0, media_path="", seed=0):
+    # Distinct, valid Egyptian mobile numbers (default code +20); a share of rows carries media
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Number", "Message", "Image"])
+        for i in range(rows):
+            image = media_path if media_path and rng.random() < media_share else ""
+            writer.writerow([f"010{i:08d}", f"Benchmark message {i} \U0001F680", image])
+    return path
+
+def run_e2e(args):
+    from fake_whatsapp import FakeWhatsAppConfig, FakeWhatsAppServer
+    from send_engine import BulkSendEngine
+
+    config = FakeWhatsAppConfig(page_latency=args.page_latency, switch_latency=args.switch_latency,
+                                confirm_latency=args.confirm_latency, upload_latency=args.upload_latency,
+                                jitter=args.jitter, failure_rate=args.failure_rate,
+                                invalid_rate=args.invalid_rate, seed=args.seed)
+    with tempfile.TemporaryDirectory(prefix="wa-bench-") as workdir:
+        media_path = ""
+        if args.media_share > 0:
+            media_path = os.path.join(workdir, "image.png")
+            with open(media_path, "wb") as f:
+                f.write(TINY_PNG)
+        contacts = generate_contacts(os.path.join(workdir, "contacts.csv"), args.rows,
+                                     args.media_share, media_path, args.seed)
+
+        with FakeWhatsAppServer(config) as server:
+            engine = BulkSendEngine("+20", args.delay, args.timeout, args.browser, args.retries,
+                                    headless=not args.show_browser, navigation=args.navigation,
+                                    sessions=args.sessions, journal_file=os.path.join(workdir, "journal.db"),
+                                    base_url=server.url)
+            start = time.monotonic()
+            engine.run(contacts)
+            elapsed = time.monotonic() - start
+            delivered = dict(server.delivered)
+
+    parts = delivered["text"] + delivered["media"]
+    print(f"Rows: {args.rows}  Sessions: {args.sessions}  Navigation: {args.navigation}")
+    print(f"Elapsed: {elapsed:.1f}s (including browser start-up)")
+    print(f"Sent: {engine.messages_sent}  Failed: {engine.messages_failed}  Skipped: {engine.messages_skipped}")
+    print(f"Delivered by the fake: {delivered['text']} text, {delivered['media']} media")
+    if elapsed > 0:
+        print(f"Throughput: {60 * parts / elapsed:.1f} messages/minute, {60 * args.rows / elapsed:.1f} rows/minute")
+    lines = engine.metrics.summary_lines()
+    if lines:
+        print("\n".join(lines))
+    return 0
+
+class BenchmarkListener(EngineListener):
+    # Feeds an UpdateChannel and a StatusStore drained UI_REFRESH_MS apart, like the Tk
+    # window does, so the GUI-side bookkeeping is part of the measurement (minus Tk itself)
+    def __init__(self, refresh_seconds=0.1):
+        from status_view import StatusStore
+        self.updates = UpdateChannel()
+        self.store = StatusStore()
+        self.refresh_seconds = refresh_seconds
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.pump, daemon=True, name="benchmark-ui")
+
+    def on_contacts_loaded(self, contacts):
+        self.updates.add_contacts(contacts)
+
+    def on_status(self, index, column, value):
+        self.updates.set_status(index, column, value)
+
+    def on_progress(self, engine):
+        self.updates.progress()
+
+    def apply(self):
+        batch = self.updates.drain()
+        for contacts in batch.contacts:
+            self.store.append(contacts)
+        for (index, column), value in batch.statuses.items():
+            self.store.set(index, column, value)
+
+    def pump(self):
+        while not self.stopped.wait(self.refresh_seconds):
+            self.apply()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        self.apply()
+
+def run_orchestration(args):
+    from fake_webdriver import FakeDriverBot
+    from send_engine import BulkSendEngine
+
+    class FakeDriverEngine(BulkSendEngine):
+        bot_class = FakeDriverBot
+
+    print(f"{'Rows':>9} {'Seconds':>9} {'Rows/s':>10} {'Parts/s':>10}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory(prefix="wa-bench-") as workdir:
+            media_path = ""
+            if args.media_share > 0:
+                media_path = os.path.join(workdir, "image.png")
+                with open(media_path, "wb") as f:
+                    f.write(TINY_PNG)
+            contacts = generate_contacts(os.path.join(workdir, "contacts.csv"), rows,
+                                         args.media_share, media_path, args.seed)
+            with BenchmarkListener() as ui:
+                engine = FakeDriverEngine("+20", 0, args.timeout, "Chrome", args.retries,
+                                          navigation=args.navigation, sessions=args.sessions,
+                                          journal_file=os.path.join(workdir, "journal.db"),
+                                          listener=ui)
+                start = time.monotonic()
+                engine.run(contacts)
+                elapsed = time.monotonic() - start
+            delivered = sum(session.bot.driver.delivered["text"] + session.bot.driver.delivered["media"]
+                            for session in engine.pool.sessions)
+        if engine.messages_sent != rows:
+            print(f"warning: {rows - engine.messages_sent} rows were not sent", file=sys.stderr)
+        print(f"{rows:>9} {elapsed:>9.2f} {rows / elapsed:>10.0f} {delivered / elapsed:>10.0f}")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput benchmarks for the bulk sender.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    e2e = commands.add_parser("e2e", help="Send a generated campaign to the local fake WhatsApp Web")
+    e2e.add_argument("--rows", type=int, default=200)
+    e2e.add_argument("--media-share", type=float, default=0.0, help="Share of rows with an image (0-1)")
+    e2e.add_argument("--sessions", type=int, default=1)
+    e2e.add_argument("--navigation", choices=("in_app", "url"), default="in_app")
+    e2e.add_argument("--browser", default="Chrome")
+    e2e.add_argument("--delay", type=float, default=0.0, help="delay_between in seconds")
+    e2e.add_argument("--timeout", type=float, default=10.0, help="wait_timeout in seconds")
+    e2e.add_argument("--retries", type=int, default=2)
+    e2e.add_argument("--page-latency", type=float, default=0.3, help="Seconds per page load")
+    e2e.add_argument("--switch-latency", type=float, default=0.1, help="Seconds per in-app chat switch")
+    e2e.add_argument("--confirm-latency", type=float, default=0.2, help="Seconds from send click to bubble")
+    e2e.add_argument("--upload-latency", type=float, default=1.0, help="Seconds a media bubble stays pending")
+    e2e.add_argument("--jitter", type=float, default=0.25, help="+/- fraction applied to every latency")
+    e2e.add_argument("--failure-rate", type=float, default=0.0, help="Share of sends silently dropped")
+    e2e.add_argument("--invalid-rate", type=float, default=0.0, help="Share of numbers reported invalid")
+    e2e.add_argument("--seed", type=int, default=0)
+    e2e.add_argument("--show-browser", action="store_true", help="Run the browser with a window")
+    e2e.set_defaults(run=run_e2e)
+
+    orchestration = commands.add_parser("orchestration", help="Engine overhead on an in-process fake WebDriver")
+    orchestration.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    orchestration.add_argument("--media-share", type=float, default=0.0, help="Share of rows with an image (0-1)")
+    orchestration.add_argument("--sessions", type=int, default=1)
+    orchestration.add_argument("--navigation", choices=("in_app", "url"), default="in_app")
+    orchestration.add_argument("--timeout", type=float, default=10.0, help="wait_timeout in seconds")
+    orchestration.add_argument("--retries", type=int, default=2)
+    orchestration.add_argument("--seed", type=int, default=0)
+    orchestration.set_defaults(run=run_orchestration)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s: %(message)s")
+    return args.run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import configparser
+import os
+
+# ----------------------- Configuration Persistence -----------------------
+CONFIG_FILE = "config.ini"
+
+DEFAULT_CONFIG = {
+    'default_country_code': '+20',
+    'delay_between': '2',
+    'burst': '1',
+    'global_rate_per_minute': '0',
+    'adaptive_pacing': 'False',
+    'min_rate_per_minute': '2',
+    'max_rate_per_minute': '60',
+    'wait_timeout': '20',
+    'browser': 'Chrome',
+    'max_retries': '2',
+    'persistent_session': 'False',
+    'chat_navigation': 'in_app',
+    'media_captions': 'True',
+    'media_preprocessing': 'True',
+    'media_cache_dir': 'media_cache',
+    'sessions': '1',
+    'suppression_list': '',
+    'skip_duplicates': 'True',
+    'schedule_timezone': '',
+    'metrics_port': '0',
+    'metrics_file': '',
+    'log_file': 'whatsapp_bot.log',
+    'log_level': 'INFO',
+    'log_levels': 'selenium=WARNING,urllib3=WARNING',
+    'log_json': 'False',
+    'log_max_mb': '10',
+    'log_backups': '5',
+    'log_rotate_when': ''
+}
+
+def load_config(path=CONFIG_FILE):
+    config = configparser.ConfigParser()
+    if os.path.exists(path):
+        # Settings added after the file was written fall back to their defaults
+        config.read_dict({'DEFAULT': DEFAULT_CONFIG})
+        config.read(path)
+    else:
+        config['DEFAULT'] = DEFAULT_CONFIG
+        with open(path, 'w') as configfile:
+            config.write(configfile)
+    return config['DEFAULT']
+
+def save_config(new_config, path=CONFIG_FILE):
+    config = configparser.ConfigParser()
+    config['DEFAULT'] = new_config
+    with open(path, 'w') as configfile:
+        config.write(configfile)
@@ -0,0 +1,78 @@
+import threading
+
+# ----------------------- Cancellation / Pause Token -----------------------
+# One token per campaign, shared by the engine, the session workers and every bot.
+# All waits (condition polls in the browser, retry backoff, schedule waits) sleep on
+# the token's events instead of time.sleep, so Stop interrupts them at once and
+# nothing has to wake up periodically just to look at a flag.
+
+class Cancelled(BaseException):
+    # Raised out of an interrupted wait. A BaseException (like asyncio.CancelledError)
+    # so the bot's broad `except Exception` retry handlers let it through.
+    pass
+
+class CancelToken:
+    def __init__(self):
+        self._stopped = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    # ----- Control -----
+    def cancel(self):
+        with self._lock:
+            self._stopped.set()
+            callbacks, self._callbacks = self._callbacks, []
+        self._running.set()  # release anyone held by a pause
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        # Calls callback() when the token is cancelled (right away if it already is), so
+        # waits on other events can be woken by Stop too. Returns a function that unregisters it.
+        with self._lock:
+            if not self._stopped.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def pause(self):
+        if not self._stopped.is_set():
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._stopped.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    # ----- Waiting -----
+    def sleep(self, seconds):
+        # Sleeps up to `seconds`; raises Cancelled as soon as the token is cancelled
+        if self._stopped.wait(max(0.0, seconds)):
+            raise Cancelled()
+
+    def wait(self, seconds):
+        # Like sleep, but returns False instead of raising when cancelled
+        return not self._stopped.wait(max(0.0, seconds))
+
+    def wait_resumed(self):
+        # Blocks while paused; raises Cancelled if stopped
+        self._running.wait()
+        self.check()
+
+    def check(self):
+        if self._stopped.is_set():
+            raise Cancelled()
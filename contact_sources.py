@@ -0,0 +1,243 @@
+import csv
+import os
+import re
+
+# ----------------------- Contact Sources -----------------------
+# Contact lists are streamed in bounded chunks so sending starts as soon as the
+# first chunk is parsed and memory does not grow with the size of the list.
+# Each chunk is a list of (index, row) pairs, rows being plain dicts keyed by the
+# canonical column names (Number/Message/Image/Video/File/Schedule).
+# Supported: XLSX (openpyxl read-only), CSV/TSV (pyarrow streaming reader when
+# installed, pandas chunks otherwise) and Parquet (pyarrow record batches).
+
+CHUNK_SIZE = 1000
+
+# Header spellings seen in CRM exports, compared lower-case with punctuation removed.
+# Most specific first: when several headers map to one column, a row takes the value
+# of the earliest alias that is filled in.
+COLUMN_ALIASES = {
+    "Number": ("number", "phonenumber", "whatsappnumber", "mobilenumber", "phone", "mobile",
+               "msisdn", "whatsapp", "phoneno", "telephone", "tel"),
+    "Message": ("message", "text", "body", "msg", "content", "messagetext"),
+    "Image": ("image", "imagepath", "photo", "picture", "img"),
+    "Video": ("video", "videopath"),
+    "File": ("file", "filepath", "document", "doc", "attachment"),
+    "Schedule": ("schedule", "scheduletime", "sendat", "sendtime", "datetime"),
+    # A single media column (as in the README example) is routed by file extension
+    "Media": ("media", "mediapath", "mediafile"),
+}
+ALIAS_LOOKUP = {alias: (canonical, rank) for canonical, aliases in COLUMN_ALIASES.items()
+                for rank, alias in enumerate(aliases)}
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp"}
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".avi", ".mkv", ".3gp", ".webm", ".m4v"}
+
+class ContactSourceError(Exception):
+    pass
+
+def column_alias(name):
+    # (canonical name, rank among its aliases); unknown headers keep their own name
+    key = re.sub(r"[^a-z0-9]", "", str(name).lower())
+    return ALIAS_LOOKUP.get(key, (str(name).strip(), 0))
+
+def canonical_column(name):
+    return column_alias(name)[0]
+
+def media_column(path):
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        return "Image"
+    if ext in VIDEO_EXTENSIONS:
+        return "Video"
+    return "File"
+
+def read_xlsx_chunks(path, chunk_size):
+    # openpyxl read-only mode parses the sheet XML lazily, row by row
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name).strip() if name is not None else "" for name in header]
+        yield columns
+        chunk = []
+        for values in rows:
+            if values is None or all(value is None for value in values):
+                continue
+            chunk.append(dict(zip(columns, values)))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        workbook.close()
+
+def read_csv_chunks(path, chunk_size, sep=","):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        yield from read_csv_chunks_pandas(path, chunk_size, sep)
+    else:
+        yield from read_csv_chunks_arrow(path, chunk_size, sep)
+
+def csv_header(path, sep):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [name.strip() for name in next(csv.reader(f, delimiter=sep), [])]
+
+def read_csv_chunks_arrow(path, chunk_size, sep):
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    columns = csv_header(path, sep)
+    yield columns
+    # Everything as text: phone numbers keep their leading zeros/plus signs
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(column_names=columns, skip_rows=1, block_size=1 << 20),
+        parse_options=pa_csv.ParseOptions(delimiter=sep),
+        convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in columns}))
+    for batch in reader:
+        rows = batch.to_pylist()
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+def read_csv_chunks_pandas(path, chunk_size, sep):
+    import pandas as pd
+    # Everything as text: phone numbers keep their leading zeros/plus signs
+    reader = pd.read_csv(path, sep=sep, dtype=str, keep_default_na=False, chunksize=chunk_size)
+    with reader:
+        first = True
+        for frame in reader:
+            if first:
+                yield [str(name).strip() for name in frame.columns]
+                first = False
+            frame.columns = [str(name).strip() for name in frame.columns]
+            yield frame.to_dict("records")
+
+def read_tsv_chunks(path, chunk_size):
+    return read_csv_chunks(path, chunk_size, sep="\t")
+
+def read_parquet_chunks(path, chunk_size):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ContactSourceError("Reading Parquet contact lists needs pyarrow (pip install pyarrow)")
+    parquet_file = pq.ParquetFile(path)
+    yield [str(name).strip() for name in parquet_file.schema_arrow.names]
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        yield batch.to_pylist()
+
+def read_legacy_excel_chunks(path, chunk_size):
+    # .xls has no streaming reader; load it once and hand it out in chunks
+    import pandas as pd
+    frame = pd.read_excel(path)
+    columns = [str(name).strip() for name in frame.columns]
+    frame.columns = columns
+    yield columns
+    for start in range(0, len(frame), chunk_size):
+        yield frame.iloc[start:start + chunk_size].to_dict("records")
+
+def estimate_rows(path, ext):
+    # Row count for the progress display, without parsing the whole file
+    if ext == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(path).metadata.num_rows
+        except Exception:
+            return None
+    if ext in (".xlsx", ".xlsm"):
+        try:
+            from openpyxl import load_workbook
+            workbook = load_workbook(path, read_only=True)
+            try:
+                max_row = workbook.active.max_row
+            finally:
+                workbook.close()
+            return max(0, max_row - 1) if max_row else None
+        except Exception:
+            return None
+    if ext in (".csv", ".tsv"):
+        # Newline count is exact unless cells contain quoted line breaks
+        count = 0
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                count += block.count(b"\n")
+        return max(0, count - 1)
+    return None
+
+READERS = {
+    ".xlsx": read_xlsx_chunks,
+    ".xlsm": read_xlsx_chunks,
+    ".xls": read_legacy_excel_chunks,
+    ".csv": read_csv_chunks,
+    ".tsv": read_tsv_chunks,
+    ".parquet": read_parquet_chunks,
+}
+
+def detect_format(path):
+    # Trust the extension when we know it, otherwise sniff the first bytes
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".tab",):
+        return ".tsv"
+    if ext in (".pq",):
+        return ".parquet"
+    if ext in READERS and ext not in (".csv",):
+        return ext
+    with open(path, "rb") as f:
+        head = f.read(4096)
+    if head.startswith(b"PAR1"):
+        return ".parquet"
+    if head.startswith(b"PK"):
+        return ".xlsx"
+    if head.startswith(b"\xd0\xcf\x11\xe0"):
+        return ".xls"
+    first_line = head.decode("utf-8", errors="ignore").splitlines()[0] if head else ""
+    if first_line.count("\t") > first_line.count(","):
+        return ".tsv"
+    return ".csv"
+
+class ContactSource:
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        try:
+            self.ext = detect_format(path)
+            self._chunks = READERS[self.ext](path, chunk_size)
+            raw_columns = next(self._chunks, None) or []
+        except ContactSourceError:
+            raise
+        except Exception as e:
+            raise ContactSourceError(f"Error reading {os.path.basename(path)}: {e}") from e
+        aliases = {raw: column_alias(raw) for raw in raw_columns}
+        self.column_map = {raw: canonical for raw, (canonical, _) in aliases.items()}
+        self.columns = list(dict.fromkeys(self.column_map.values()))
+        # Raw headers in priority order, so the most specific alias is read first
+        self.raw_order = sorted(raw_columns, key=lambda raw: aliases[raw][1])
+        if "Media" in self.columns:
+            self.columns += [name for name in ("Image", "Video", "File") if name not in self.columns]
+        self.estimated_rows = estimate_rows(path, self.ext)
+
+    def canonical_row(self, raw_row):
+        row = {}
+        for raw in self.raw_order:
+            value = raw_row.get(raw)
+            name = self.column_map[raw]
+            if name not in row or row[name] in (None, ""):
+                row[name] = value
+        media = row.pop("Media", None)
+        if media not in (None, ""):
+            row.setdefault(media_column(media), media)
+        return row
+
+    def chunks(self):
+        index = 0
+        for rows in self._chunks:
+            chunk = []
+            for raw_row in rows:
+                chunk.append((index, self.canonical_row(raw_row)))
+                index += 1
+            yield chunk
+
+def open_contact_source(path, chunk_size=CHUNK_SIZE):
+    return ContactSource(path, chunk_size)
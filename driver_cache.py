@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+
+# ----------------------- Driver Cache -----------------------
+# ChromeDriver/GeckoDriver binaries resolved once per installed browser version and
+# reused from ./drivers without any network access. A cache hit is verified against
+# the recorded SHA-256 before use; webdriver_manager is only consulted on a miss.
+
+DRIVER_CACHE_DIR = "drivers"
+INDEX_FILE = "index.json"
+
+BROWSER_COMMANDS = {
+    "Chrome": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+               "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"],
+    "Firefox": ["firefox", "/Applications/Firefox.app/Contents/MacOS/firefox"],
+}
+WINDOWS_VERSION_KEYS = {
+    "Chrome": r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon",
+    "Firefox": r"HKEY_LOCAL_MACHINE\Software\Mozilla\Mozilla Firefox",
+}
+VERSION_PATTERN = re.compile(r"(\d+)\.[\d.]+")
+
+_lock = threading.Lock()
+_verified = {}  # path -> (mtime, size) already checked in this process
+_resolved = {}  # browser -> driver path; relaunches within a run reuse it directly
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def browser_version(browser_choice):
+    # Full version string of the installed browser, None if it can't be determined
+    candidates = []
+    if sys.platform.startswith("win"):
+        key = WINDOWS_VERSION_KEYS.get(browser_choice)
+        if key:
+            value = "version" if browser_choice == "Chrome" else "CurrentVersion"
+            candidates.append(["reg", "query", key, "/v", value])
+    candidates += [[command, "--version"] for command in BROWSER_COMMANDS.get(browser_choice, [])]
+    for command in candidates:
+        try:
+            output = subprocess.run(command, capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = VERSION_PATTERN.search(output)
+        if match:
+            return match.group(0)
+    return None
+
+def version_tuple(version):
+    # "120.0.6099.109" -> (120, 0, 6099, 109); unknown versions sort first
+    return tuple(int(part) for part in re.findall(r"\d+", version or ""))
+
+def cache_key(browser_choice, version):
+    major = version.split(".")[0] if version else "unknown"
+    return f"{browser_choice.lower()}-{major}"
+
+class DriverCache:
+    def __init__(self, cache_dir=DRIVER_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+
+    def load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self, index):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def is_valid(self, entry):
+        path = entry.get("path")
+        if not path or not os.path.isfile(path):
+            return False
+        stat = os.stat(path)
+        if _verified.get(path) == (stat.st_mtime, stat.st_size):
+            return True
+        if file_sha256(path) != entry.get("sha256"):
+            logging.warning(f"Cached driver {path} failed its checksum, resolving again.")
+            return False
+        _verified[path] = (stat.st_mtime, stat.st_size)
+        return True
+
+    def lookup(self, key):
+        entry = self.load_index().get(key)
+        return entry["path"] if entry and self.is_valid(entry) else None
+
+    def latest_for(self, browser_choice):
+        # Newest valid driver we have for this browser, whatever version it was resolved for
+        prefix = browser_choice.lower() + "-"
+        entries = [entry for key, entry in self.load_index().items() if key.startswith(prefix)]
+        for entry in sorted(entries, key=lambda e: version_tuple(e.get("browser_version")), reverse=True):
+            if self.is_valid(entry):
+                return entry["path"]
+        return None
+
+    def store(self, key, source_path, version):
+        target_dir = os.path.join(self.cache_dir, key)
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, os.path.basename(source_path))
+        shutil.copy2(source_path, target)
+        index = self.load_index()
+        index[key] = {"path": target, "sha256": file_sha256(target), "browser_version": version}
+        self.save_index(index)
+        return target
+
+    def download(self, browser_choice):
+        if browser_choice == "Chrome":
+            from webdriver_manager.chrome import ChromeDriverManager
+            return ChromeDriverManager().install()
+        if browser_choice == "Firefox":
+            from webdriver_manager.firefox import GeckoDriverManager
+            return GeckoDriverManager().install()
+        raise ValueError(f"Unsupported browser: {browser_choice}")
+
+    def resolve(self, browser_choice):
+        with _lock:
+            path = _resolved.get(browser_choice)
+            if path and os.path.isfile(path):
+                return path
+            path = self.resolve_uncached(browser_choice)
+            _resolved[browser_choice] = path
+            return path
+
+    def resolve_uncached(self, browser_choice):
+        version = browser_version(browser_choice)
+        key = cache_key(browser_choice, version)
+        # Unknown browser version (unusual install, no PATH entry): trust the newest cached driver
+        path = self.lookup(key) if version else self.latest_for(browser_choice)
+        if path:
+            return path
+        try:
+            downloaded = self.download(browser_choice)
+        except Exception:
+            path = self.latest_for(browser_choice)
+            if path:
+                logging.warning(f"Driver download failed, using cached {path}.")
+                return path
+            raise
+        logging.info(f"Caching {browser_choice} driver for browser version {version or 'unknown'}.")
+        return self.store(key, downloaded, version)
+
+_default_cache = DriverCache()
+
+def resolve_driver(browser_choice):
+    return _default_cache.resolve(browser_choice)
@@ -0,0 +1,277 @@
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ----------------------- Fake WhatsApp Web -----------------------
+# A local stand-in for web.whatsapp.com with the same selectors WhatsAppBot relies on:
+# the chat list (#pane-side), the /send?phone=&text= route, in-app wa.me link routing,
+# the new-chat search, the compose box and send button, Attach + file input + media
+# preview, outgoing bubbles with the pending clock icon, and the invalid-number popup.
+# Page loads, send confirmation and uploads take configurable (jittered) time, and a
+# share of sends can be dropped or numbers reported invalid, so the bot's waits,
+# retries and fallbacks run as they would against the real service. Point the bot at
+# it with base_url (see benchmark.py).
+
+class FakeWhatsAppConfig:
+    def __init__(self, page_latency=0.3, switch_latency=0.1, confirm_latency=0.2, upload_latency=1.0,
+                 jitter=0.25, failure_rate=0.0, invalid_rate=0.0, seed=None):
+        self.page_latency = page_latency        # server-side delay for / and /send
+        self.switch_latency = switch_latency    # in-app chat switch
+        self.confirm_latency = confirm_latency  # send click -> outgoing bubble
+        self.upload_latency = upload_latency    # media bubble pending -> delivered
+        self.jitter = jitter                    # +/- fraction applied to every latency
+        self.failure_rate = failure_rate        # share of send clicks that are silently dropped
+        self.invalid_rate = invalid_rate        # share of numbers reported as not on WhatsApp
+        self.seed = seed
+
+    def client_settings(self):
+        return {name: getattr(self, name) for name in
+                ("switch_latency", "confirm_latency", "upload_latency", "jitter", "failure_rate", "invalid_rate")}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>WhatsApp</title>
+<style>
+body { font-family: sans-serif; margin: 0; display: flex; height: 100vh; }
+#side { width: 280px; border-right: 1px solid #ccc; }
+#app { flex: 1; display: flex; flex-direction: column; }
+#main { flex: 1; display: flex; flex-direction: column; }
+.messages { flex: 1; overflow: auto; padding: 8px; }
+.message-out { background: #d9fdd3; margin: 4px 0 4px auto; padding: 4px 8px; max-width: 70%; }
+footer { display: flex; padding: 6px; border-top: 1px solid #ccc; }
+footer [contenteditable] { flex: 1; min-height: 20px; border: 1px solid #aaa; padding: 4px; }
+span[data-icon], button { display: inline-block; min-width: 24px; min-height: 20px; cursor: pointer; }
+.preview { position: fixed; inset: 20% 30%; background: #fff; border: 1px solid #888; padding: 12px; }
+[data-animate-modal-popup] { position: fixed; inset: 40% 35%; background: #fff; border: 2px solid #c00; padding: 12px; }
+</style></head>
+<body>
+<div id="side">
+  <div id="pane-side">
+    <span data-icon="chat" title="New chat">+</span>
+    <div id="search-panel"></div>
+  </div>
+</div>
+<div id="app"></div>
+<script>
+var CONFIG = __CONFIG__;
+var INITIAL = __INITIAL__;
+
+function later(seconds, fn) {
+  var factor = 1 + CONFIG.jitter * (2 * Math.random() - 1);
+  setTimeout(fn, Math.max(0, seconds * factor * 1000));
+}
+
+function isInvalid(phone) {
+  // Stable per number, so retries and fallbacks see the same answer
+  var h = 2166136261;
+  for (var i = 0; i < phone.length; i++) { h ^= phone.charCodeAt(i); h = Math.imul(h, 16777619) >>> 0; }
+  return (h % 10000) / 10000 < CONFIG.invalid_rate;
+}
+
+function report(kind, phone) {
+  fetch('/api/sent', {method: 'POST', body: JSON.stringify({kind: kind, phone: phone})});
+}
+
+function showInvalidPopup() {
+  var popup = document.createElement('div');
+  popup.setAttribute('data-animate-modal-popup', 'true');
+  popup.tabIndex = 0;
+  popup.textContent = 'Phone number shared via url is invalid.';
+  popup.addEventListener('keydown', function (e) { if (e.key === 'Escape') popup.remove(); });
+  document.body.appendChild(popup);
+}
+
+function sendButton(onClick) {
+  var button = document.createElement('span');
+  button.setAttribute('data-icon', 'send');
+  button.textContent = '>';
+  button.addEventListener('click', onClick);
+  return button;
+}
+
+function addBubble(main, text, pendingSeconds) {
+  var bubble = document.createElement('div');
+  bubble.className = 'message-out';
+  bubble.textContent = text;
+  if (pendingSeconds) {
+    var clock = document.createElement('span');
+    clock.setAttribute('data-icon', 'msg-time');
+    bubble.appendChild(clock);
+    later(pendingSeconds, function () { clock.remove(); });
+  }
+  main.querySelector('.messages').appendChild(bubble);
+}
+
+function deliver(main, phone, kind, text, pendingSeconds) {
+  // A dropped send leaves no bubble, so the bot's confirmation wait times out
+  if (Math.random() < CONFIG.failure_rate) return;
+  later(CONFIG.confirm_latency, function () {
+    if (!main.isConnected) return;
+    addBubble(main, text, pendingSeconds);
+    report(kind, phone);
+  });
+}
+
+function openChat(phone, text) {
+  var old = document.getElementById('main');
+  if (old) old.remove();
+  if (isInvalid(phone)) { showInvalidPopup(); return; }
+
+  var main = document.createElement('div');
+  main.id = 'main';
+  main.innerHTML = '<header>' + phone + '</header><div class="messages"></div>' +
+    '<footer><button title="Attach">@</button><div contenteditable="true" data-tab="10"></div></footer>';
+  var footer = main.querySelector('footer');
+  var compose = footer.querySelector('[contenteditable]');
+  var send = sendButton(function () {
+    var message = compose.textContent;
+    compose.textContent = '';
+    send.remove();
+    deliver(main, phone, 'text', message, 0);
+  });
+  compose.addEventListener('input', function () {
+    if (compose.textContent && !send.isConnected) footer.appendChild(send);
+  });
+  if (text) { compose.textContent = text; footer.appendChild(send); }
+
+  footer.querySelector('button[title="Attach"]').addEventListener('click', function () {
+    if (footer.querySelector('input[type="file"]')) return;
+    var input = document.createElement('input');
+    input.type = 'file';
+    input.addEventListener('change', function () {
+      var name = input.files.length ? input.files[0].name : 'file';
+      input.remove();
+      var preview = document.createElement('div');
+      preview.className = 'preview';
+      preview.textContent = name;
+      var caption = document.createElement('div');
+      caption.contentEditable = 'true';
+      caption.setAttribute('aria-label', 'Add a caption');
+      preview.appendChild(caption);
+      preview.appendChild(sendButton(function () {
+        preview.remove();
+        var body = caption.textContent ? name + '\n' + caption.textContent : name;
+        deliver(main, phone, 'media', body, CONFIG.upload_latency);
+      }));
+      document.body.appendChild(preview);
+    });
+    footer.appendChild(input);
+  });
+  document.getElementById('app').appendChild(main);
+}
+
+// In-app routing: wa.me links clicked inside the app switch chats without a reload
+document.getElementById('app').addEventListener('click', function (e) {
+  var link = e.target.closest && e.target.closest('a[href*="wa.me/"]');
+  if (!link) return;
+  e.preventDefault();
+  var phone = link.href.split('wa.me/')[1].split(/[?#]/)[0];
+  later(CONFIG.switch_latency, function () { openChat(phone, ''); });
+});
+
+// New-chat search
+document.querySelector('span[data-icon="chat"]').addEventListener('click', function () {
+  var panel = document.getElementById('search-panel');
+  panel.innerHTML = '<div contenteditable="true" data-tab="3"></div><div aria-label="Search results."></div>';
+  var box = panel.querySelector('[data-tab="3"]');
+  var results = panel.querySelector('[aria-label="Search results."]');
+  box.focus();
+  box.addEventListener('input', function () {
+    results.innerHTML = box.textContent ? '<div role="listitem">' + box.textContent + '</div>' : '';
+  });
+  box.addEventListener('keydown', function (e) {
+    if (e.key !== 'Enter') return;
+    e.preventDefault();
+    var phone = box.textContent.trim();
+    panel.innerHTML = '';
+    later(CONFIG.switch_latency, function () { openChat(phone, ''); });
+  });
+});
+
+if (INITIAL.phone) openChat(INITIAL.phone, INITIAL.text);
+</script>
+</body></html>
+"""
+
+class FakeWhatsAppServer:
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or FakeWhatsAppConfig()
+        self.random = random.Random(self.config.seed)
+        self.lock = threading.Lock()
+        self.delivered = {"text": 0, "media": 0}
+        self.httpd = ThreadingHTTPServer((host, port), self.handler_class())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page(self, phone="", text=""):
+        initial = {"phone": phone.lstrip("+").strip(), "text": text}
+        # </ is escaped so a message can't close the script element
+        return (PAGE_TEMPLATE
+                .replace("__CONFIG__", json.dumps(self.config.client_settings()))
+                .replace("__INITIAL__", json.dumps(initial).replace("</", "<\\/")))
+
+    def page_delay(self):
+        config = self.config
+        with self.lock:
+            factor = 1 + config.jitter * (2 * self.random.random() - 1)
+        time.sleep(max(0.0, config.page_latency * factor))
+
+    def record(self, kind):
+        with self.lock:
+            self.delivered[kind] = self.delivered.get(kind, 0) + 1
+
+    def handler_class(self):
+        server = self
+
+        class FakeWhatsAppHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urllib.parse.urlparse(self.path)
+                if parsed.path not in ("/", "/send"):
+                    self.send_error(404)
+                    return
+                query = urllib.parse.parse_qs(parsed.query)
+                server.page_delay()
+                body = server.page(query.get("phone", [""])[0], query.get("text", [""])[0]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path != "/api/sent":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    server.record(json.loads(self.rfile.read(length) or b"{}").get("kind", "text"))
+                except ValueError:
+                    pass
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return FakeWhatsAppHandler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="fake-whatsapp")
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,90 @@
+import logging
+import threading
+
+# ----------------------- GUI Update Channel -----------------------
+# Worker threads never touch Tk. They publish deltas here and the Tk thread drains
+# them in one batch per frame (see BotApp.pump_updates): repeated status changes for
+# the same cell collapse into the last one, and any number of progress notifications
+# between two frames cost a single label refresh. Each campaign gets its own channel;
+# the previous one is closed so a stopped engine can no longer reach the window.
+
+class UpdateBatch:
+    def __init__(self):
+        self.contacts = []   # lists of (index, number, schedule), in arrival order
+        self.statuses = {}   # (index, column) -> latest value
+        self.progress = False
+        self.calls = []      # (func, args, reply) to run on the Tk thread
+
+class UiCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class UpdateChannel:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = UpdateBatch()
+        self.closed = False
+
+    def add_contacts(self, contacts):
+        with self.lock:
+            if not self.closed:
+                self.pending.contacts.append(contacts)
+
+    def set_status(self, index, column, value):
+        with self.lock:
+            if not self.closed:
+                self.pending.statuses[(index, column)] = value
+
+    def progress(self):
+        with self.lock:
+            self.pending.progress = not self.closed
+
+    def post(self, func, *args):
+        # Fire-and-forget call on the Tk thread
+        with self.lock:
+            if not self.closed:
+                self.pending.calls.append((func, args, None))
+
+    def call(self, func, *args, timeout=None):
+        # Runs func on the Tk thread and blocks the caller until it returned (e.g. a dialog)
+        reply = UiCall()
+        with self.lock:
+            if self.closed:
+                return None
+            self.pending.calls.append((func, args, reply))
+        reply.done.wait(timeout)
+        if reply.error is not None:
+            raise reply.error
+        return reply.result
+
+    def close(self):
+        # Drops everything still pending or sent later, and releases callers blocked in call()
+        with self.lock:
+            self.closed = True
+            batch, self.pending = self.pending, UpdateBatch()
+        for _, _, reply in batch.calls:
+            if reply is not None:
+                reply.done.set()
+
+    def drain(self):
+        with self.lock:
+            batch, self.pending = self.pending, UpdateBatch()
+        return batch
+
+    @staticmethod
+    def run_calls(batch):
+        for func, args, reply in batch.calls:
+            try:
+                result = func(*args)
+                if reply is not None:
+                    reply.result = result
+            except Exception as e:
+                if reply is None:
+                    logging.exception("GUI update failed.")
+                else:
+                    reply.error = e
+            finally:
+                if reply is not None:
+                    reply.done.set()
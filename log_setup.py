@@ -0,0 +1,100 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+
+# ----------------------- Logging Setup -----------------------
+# Log calls on the send threads only enqueue the record; a QueueListener thread does the
+# formatting and the file/console I/O. The file rotates by size (or by time when
+# `rotate_when` is set, e.g. "midnight"), so week-long campaigns keep a bounded
+# number of bounded files. Selenium and urllib3 log every WebDriver command at DEBUG,
+# so they are held at WARNING unless configured otherwise.
+
+LOG_FILE = "whatsapp_bot.log"
+LOG_FORMAT = "%(asctime)s %(levelname)s: %(message)s"
+DEFAULT_LOGGER_LEVELS = {
+    "selenium": "WARNING",
+    "urllib3": "WARNING",
+    "WDM": "WARNING",
+}
+
+_listener = None
+
+class JsonLinesFormatter(logging.Formatter):
+    # One JSON object per line, for log shippers and jq
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def parse_logger_levels(text):
+    # "selenium=WARNING, send_engine=DEBUG" -> {"selenium": "WARNING", "send_engine": "DEBUG"}
+    levels = {}
+    for item in str(text or "").split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def file_handler(log_file, max_bytes, backup_count, rotate_when):
+    if rotate_when:
+        return logging.handlers.TimedRotatingFileHandler(log_file, when=rotate_when, backupCount=backup_count,
+                                                         encoding="utf-8")
+    return logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                encoding="utf-8")
+
+def setup_logging(log_file=LOG_FILE, level="INFO", json_lines=False, max_bytes=10 * 1024 * 1024,
+                  backup_count=5, rotate_when="", console=True, logger_levels=None):
+    # Returns the running QueueListener; it is stopped (and the queue flushed) at exit
+    global _listener
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if _listener is not None:
+        atexit.unregister(_listener.stop)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+
+    handlers = []
+    if log_file:
+        handler = file_handler(log_file, max_bytes, backup_count, rotate_when)
+        handler.setFormatter(JsonLinesFormatter() if json_lines else logging.Formatter(LOG_FORMAT))
+        handlers.append(handler)
+    if console:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(handler)
+
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(str(level).upper())
+
+    for name, logger_level in {**DEFAULT_LOGGER_LEVELS, **(logger_levels or {})}.items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    listener.start()
+    atexit.register(listener.stop)
+    _listener = listener
+    return listener
+
+def setup_logging_from_config(config, console=True):
+    return setup_logging(
+        log_file=config.get('log_file', LOG_FILE),
+        level=config.get('log_level', 'INFO'),
+        json_lines=config.get('log_json', 'False') == 'True',
+        max_bytes=int(float(config.get('log_max_mb', '10')) * 1024 * 1024),
+        backup_count=int(config.get('log_backups', '5')),
+        rotate_when=config.get('log_rotate_when', ''),
+        console=console,
+        logger_levels=parse_logger_levels(config.get('log_levels', '')),
+    )
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from driver_cache import file_sha256
+
+# ----------------------- Media Asset Registry -----------------------
+# A campaign usually sends the same few files to thousands of contacts. Every distinct
+# media path is resolved, stat'ed and hashed once before sending starts, so missing,
+# empty or oversized files are reported up front and their parts fail at once instead
+# of after clicking Attach and timing out. Hashing reads the whole file, which also
+# leaves it in the OS page cache; files on network shares are copied to local disk in
+# the same pass and uploaded from there. Relative paths are tried against the working
+# directory first, then against the contact list's folder.
+
+ASSET_DIR = os.path.join("media_cache", "assets")
+HASH_WORKERS = 4
+READ_CHUNK = 1 << 20
+# WhatsApp's upload limits per column
+UPLOAD_LIMITS = {"Image": 16 << 20, "Video": 16 << 20, "File": 2 << 30}
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smbfs", "smb3", "9p", "afs", "fuse.sshfs", "davfs", "ncpfs"}
+
+class MediaAsset:
+    def __init__(self, media_type, path):
+        self.media_type = media_type
+        self.path = path            # as written in the sheet
+        self.resolved = None        # absolute path of the source file
+        self.upload_path = None     # what is uploaded: the source, or its local copy
+        self.size = 0
+        self.sha256 = None
+        self.copied = False
+        self.problem = None         # why the asset can't be sent, None when it can
+        self.rows = 0
+
+def network_mounts():
+    # Mount points of network filesystems (Linux); empty elsewhere
+    mounts = []
+    try:
+        with open("/proc/mounts") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) > 2 and fields[2] in NETWORK_FILESYSTEMS:
+                    mounts.append(fields[1].replace("\\040", " "))
+    except OSError:
+        pass
+    return mounts
+
+def is_network_path(path, mounts):
+    if sys.platform.startswith("win"):
+        if path.startswith("\\\\"):
+            return True  # UNC path
+        drive = os.path.splitdrive(path)[0]
+        if not drive:
+            return False
+        import ctypes
+        DRIVE_REMOTE = 4
+        return ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == DRIVE_REMOTE
+    return any(path == mount or path.startswith(mount.rstrip("/") + "/") for mount in mounts)
+
+class MediaRegistry:
+    def __init__(self, base_dir="", asset_dir=ASSET_DIR, shrinkable=()):
+        self.base_dir = base_dir
+        self.asset_dir = asset_dir
+        self.shrinkable = set(shrinkable)  # types the preprocessor fits to the limits anyway
+        self.assets = {}  # (media_type, path) -> MediaAsset, in first-seen order
+
+    def add(self, media_type, path):
+        asset = self.assets.get((media_type, path))
+        if asset is None:
+            asset = self.assets[(media_type, path)] = MediaAsset(media_type, path)
+        asset.rows += 1
+        return asset
+
+    def get(self, media_type, path):
+        return self.assets.get((media_type, path))
+
+    def __len__(self):
+        return len(self.assets)
+
+    def resolve(self, path):
+        expanded = os.path.expandvars(os.path.expanduser(path))
+        candidates = [expanded]
+        if self.base_dir and not os.path.isabs(expanded):
+            candidates.append(os.path.join(self.base_dir, expanded))
+        for candidate in candidates:
+            if os.path.exists(candidate):
+                return os.path.abspath(candidate)
+        return None
+
+    def check(self):
+        # Resolves, stats and hashes every asset; returns the ones that can't be sent
+        mounts = network_mounts()
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="media-check") as pool:
+            list(pool.map(lambda asset: self.check_asset(asset, mounts), self.assets.values()))
+        return [asset for asset in self.assets.values() if asset.problem]
+
+    def check_asset(self, asset, mounts):
+        asset.resolved = self.resolve(asset.path)
+        if asset.resolved is None:
+            asset.problem = "file not found"
+            return
+        if not os.path.isfile(asset.resolved):
+            asset.problem = "not a file"
+            return
+        asset.size = os.path.getsize(asset.resolved)
+        limit = UPLOAD_LIMITS.get(asset.media_type)
+        if asset.size == 0:
+            asset.problem = "file is empty"
+            return
+        if limit and asset.size > limit and asset.media_type not in self.shrinkable:
+            asset.problem = f"{asset.size / (1 << 20):.1f} MB is over WhatsApp's {limit >> 20} MB limit"
+            return
+        try:
+            if is_network_path(asset.resolved, mounts):
+                asset.sha256, asset.upload_path = self.copy_local(asset.resolved)
+                asset.copied = True
+            else:
+                asset.sha256 = file_sha256(asset.resolved)
+                asset.upload_path = asset.resolved
+        except OSError as e:
+            asset.problem = f"unreadable ({e.strerror or e})"
+
+    def copy_local(self, path):
+        # One read of the share: copied and hashed together, stored as assets/<sha256>/<name>
+        # so WhatsApp still shows the original file name
+        os.makedirs(self.asset_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        tmp_path = os.path.join(self.asset_dir, f".{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            with open(path, "rb") as source, open(tmp_path, "wb") as target:
+                for chunk in iter(lambda: source.read(READ_CHUNK), b""):
+                    digest.update(chunk)
+                    target.write(chunk)
+            folder = os.path.join(self.asset_dir, digest.hexdigest())
+            local_path = os.path.abspath(os.path.join(folder, os.path.basename(path)))
+            if os.path.exists(local_path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(folder, exist_ok=True)
+                os.replace(tmp_path, local_path)
+                shutil.copystat(path, local_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return digest.hexdigest(), local_path
+
+    def summary_lines(self):
+        if not self.assets:
+            return []
+        ok = [asset for asset in self.assets.values() if not asset.problem]
+        distinct = len({asset.sha256 for asset in ok})
+        lines = [f"Media: {len(self.assets)} distinct paths ({distinct} distinct files, "
+                 f"{sum(asset.size for asset in ok) / 1e6:.1f} MB) used in "
+                 f"{sum(asset.rows for asset in self.assets.values())} parts"]
+        copied = [asset for asset in ok if asset.copied]
+        if copied:
+            lines.append(f"Media: {len(copied)} files copied from network shares to {os.path.abspath(self.asset_dir)}")
+        return lines
@@ -0,0 +1,191 @@
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from driver_cache import file_sha256
+
+# ----------------------- Media Preprocessing -----------------------
+# Images and videos are brought within WhatsApp's limits in a process pool before the
+# sender reaches them: oversized images are downscaled and re-encoded (Pillow), videos
+# over the size limit are transcoded to H.264/AAC at a bitrate that fits, and trimmed
+# when even the minimum bitrate would not (ffmpeg/ffprobe on PATH). Outputs are cached
+# under the SHA-256 of the source plus the limits, so the same asset is processed once
+# across campaigns. Files already within the limits are sent as they are without being
+# hashed. Without Pillow or ffmpeg the affected media is sent unchanged.
+
+MEDIA_CACHE_DIR = "media_cache"
+AUDIO_KBPS = 96
+MIN_VIDEO_KBPS = 300
+SIZE_HEADROOM = 0.9  # container overhead and rate control overshoot
+
+class MediaLimits:
+    def __init__(self, max_image_px=1600, max_image_bytes=5 << 20, max_video_bytes=16 << 20,
+                 max_video_px=1280, image_quality=85):
+        self.max_image_px = max_image_px
+        self.max_image_bytes = max_image_bytes
+        self.max_video_bytes = max_video_bytes
+        self.max_video_px = max_video_px
+        self.image_quality = image_quality
+
+    def fingerprint(self):
+        return (f"i{self.max_image_px}-{self.max_image_bytes}-q{self.image_quality}"
+                f"-v{self.max_video_px}-{self.max_video_bytes}")
+
+class MediaPrepError(Exception):
+    pass
+
+def preprocessable_types():
+    # Media types whose tool is installed: Pillow for images, ffmpeg and ffprobe for videos
+    import importlib.util
+    types = set()
+    if importlib.util.find_spec("PIL") is not None:
+        types.add("Image")
+    if shutil.which("ffmpeg") and shutil.which("ffprobe"):
+        types.add("Video")
+    return types
+
+# ----- Worker side (runs in the process pool) -----
+def image_needs_work(path, limits):
+    from PIL import Image
+    with Image.open(path) as image:
+        if image.format == "GIF":
+            return False  # animations would lose their frames
+        return max(image.size) > limits.max_image_px or os.path.getsize(path) > limits.max_image_bytes
+
+def prepare_image(source, target, limits):
+    from PIL import Image, ImageOps
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((limits.max_image_px, limits.max_image_px))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(target, "JPEG", quality=limits.image_quality, optimize=True)
+
+def probe_duration(source):
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        raise MediaPrepError("ffprobe not found on PATH")
+    output = subprocess.run([ffprobe, "-v", "error", "-show_entries", "format=duration",
+                             "-of", "default=noprint_wrappers=1:nokey=1", source],
+                            capture_output=True, text=True, timeout=60).stdout
+    try:
+        return float(output.strip())
+    except ValueError:
+        raise MediaPrepError(f"Could not read the duration of {source}") from None
+
+def prepare_video(source, target, limits):
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        raise MediaPrepError("ffmpeg not found on PATH")
+    duration = probe_duration(source)
+    budget_kbps = limits.max_video_bytes * 8 * SIZE_HEADROOM / duration / 1000
+    video_kbps = budget_kbps - AUDIO_KBPS
+    if video_kbps < MIN_VIDEO_KBPS:
+        # Too long to fit at an acceptable quality: keep the beginning
+        video_kbps = MIN_VIDEO_KBPS
+        duration = limits.max_video_bytes * 8 * SIZE_HEADROOM / ((MIN_VIDEO_KBPS + AUDIO_KBPS) * 1000)
+    px = limits.max_video_px
+    scale = f"scale='if(gte(iw,ih),min({px},iw),-2)':'if(gte(iw,ih),-2,min({px},ih))'"
+    command = [ffmpeg, "-y", "-v", "error", "-i", source, "-t", f"{duration:.2f}", "-vf", scale,
+               "-c:v", "libx264", "-preset", "veryfast", "-b:v", f"{video_kbps:.0f}k",
+               "-maxrate", f"{video_kbps:.0f}k", "-bufsize", f"{2 * video_kbps:.0f}k",
+               "-c:a", "aac", "-b:a", f"{AUDIO_KBPS}k", "-movflags", "+faststart", "-f", "mp4", target]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise MediaPrepError(f"ffmpeg failed: {result.stderr.strip()[-300:]}")
+
+def prepare_media(path, media_type, cache_dir, limits, digest=None):
+    # Returns (path to upload, note); the source path itself when nothing had to change.
+    # `digest` is the source's SHA-256 when the caller already has it.
+    if media_type == "Image":
+        if not image_needs_work(path, limits):
+            return path, None
+        prepare, extension = prepare_image, ".jpg"
+    elif media_type == "Video":
+        if os.path.getsize(path) <= limits.max_video_bytes:
+            return path, None
+        prepare, extension = prepare_video, ".mp4"
+    else:
+        return path, None
+    key = f"{digest or file_sha256(path)}-{limits.fingerprint()}"
+    target = os.path.join(cache_dir, key[:2], key + extension)
+    if os.path.exists(target):
+        return target, "cached copy"
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # Written under a temporary name so a crash never leaves a truncated cache entry
+    tmp_path = f"{target}.{os.getpid()}.tmp{extension}"
+    try:
+        prepare(path, tmp_path, limits)
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    before, after = os.path.getsize(path), os.path.getsize(target)
+    return target, f"prepared, {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB"
+
+# ----- Engine side -----
+class MediaPreprocessor:
+    def __init__(self, cache_dir=MEDIA_CACHE_DIR, workers=None, limits=None, log=logging.info):
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.limits = limits or MediaLimits()
+        self.log = log
+        self.lock = threading.Lock()
+        self.executor = None
+        self.closed = False
+        self.jobs = {}  # (media_type, path) -> Future, one per distinct asset
+
+    def submit(self, path, media_type, source=None, digest=None):
+        # Future for the sheet's `path`, read from `source` (default: the path itself);
+        # None once the campaign has ended
+        key = (media_type, path)
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is None and not self.closed:
+                if self.executor is None:
+                    self.executor = ProcessPoolExecutor(max_workers=self.workers)
+                source = os.path.abspath(source or path)
+                job = self.jobs[key] = self.executor.submit(prepare_media, source, media_type,
+                                                            os.path.abspath(self.cache_dir), self.limits, digest)
+                job.source = source
+            return job
+
+    def submitted(self, path, media_type):
+        with self.lock:
+            return (media_type, path) in self.jobs
+
+    def resolve(self, path, media_type, cancel_token):
+        # Path to upload instead of `path`; waits if the job has not finished yet
+        job = self.submit(path, media_type)
+        if job is None:
+            return os.path.abspath(path)
+        if not job.done():
+            # Woken by the job finishing or by Stop, whichever comes first
+            finished = threading.Event()
+            job.add_done_callback(lambda _: finished.set())
+            unregister = cancel_token.on_cancel(finished.set)
+            finished.wait()
+            unregister()
+        cancel_token.check()
+        try:
+            prepared, note = job.result()
+        except Exception as e:
+            prepared, note = job.source, f"could not preprocess, sending it as is: {e}"
+        # Every row using the asset gets the same result; it is only logged for the first
+        with self.lock:
+            first = not getattr(job, "reported", False)
+            job.reported = True
+        if note and first:
+            self.log(f"{media_type} '{path}': {note}")
+        return prepared
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+            self.jobs.clear()
@@ -0,0 +1,89 @@
+import statistics
+import threading
+import time
+
+# ----------------------- Adaptive Pacing -----------------------
+# AIMD (additive increase, multiplicative decrease) on the per-account sending rate.
+# Outcomes are judged in windows of WINDOW parts. A window is unhealthy when too many
+# parts failed, too many waits timed out, or the median send time of a part type grew
+# well past that type's first window (WhatsApp Web slowing down usually comes before
+# failures; text and media are compared separately since uploads are slower). Healthy
+# windows raise the rate by a fixed step and unhealthy ones cut it by a factor, always
+# within the user's bounds. Every change is kept in `history` with its reason.
+
+WINDOW = 10
+INCREASE_STEP = 2.0          # messages/minute added after a healthy window
+DECREASE_FACTOR = 0.5        # rate multiplier after an unhealthy window
+MAX_FAILURE_RATIO = 0.1
+MAX_TIMEOUT_RATIO = 0.2      # stage timeouts per part
+SLOWDOWN_FACTOR = 2.0        # median send time vs the part's baseline window
+
+class PacingController:
+    def __init__(self, min_rate, max_rate, window=WINDOW, step=INCREASE_STEP, factor=DECREASE_FACTOR):
+        self.min_rate = max(0.1, float(min_rate))
+        self.max_rate = max(self.min_rate, float(max_rate))
+        self.window = window
+        self.step = step
+        self.factor = factor
+        self.lock = threading.Lock()
+        self.baselines = {}  # part -> median send time of the first window it appeared in
+        self.history = []  # (time, old rate, new rate, reason)
+        self.reset_window()
+
+    def reset_window(self):
+        self.outcomes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.durations = {}  # part -> send times in this window
+
+    def clamp(self, rate):
+        return min(self.max_rate, max(self.min_rate, rate))
+
+    def initial_rate(self, rate):
+        # Unlimited (0) starts at the upper bound
+        return self.clamp(rate or self.max_rate)
+
+    def record_stage(self, ok):
+        if not ok:
+            with self.lock:
+                self.timeouts += 1
+
+    def record_part(self, part, success, seconds, current_rate):
+        # Returns (new rate, reason) when the window closes with a change, otherwise None
+        with self.lock:
+            self.outcomes += 1
+            self.durations.setdefault(part, []).append(seconds)
+            if not success:
+                self.failures += 1
+            if self.outcomes < self.window:
+                return None
+            decision = self.decide(current_rate or self.max_rate)
+            self.reset_window()
+            if decision is None:
+                return None
+            new_rate, reason = decision
+            self.history.append((time.time(), current_rate, new_rate, reason))
+            return decision
+
+    def decide(self, rate):
+        medians = {part: statistics.median(durations) for part, durations in self.durations.items()}
+        slow = None
+        for part, median in sorted(medians.items()):
+            baseline = self.baselines.setdefault(part, median)
+            if baseline and median > SLOWDOWN_FACTOR * baseline and slow is None:
+                slow = f"slowdown ({part} {median:.1f}s, baseline {baseline:.1f}s)"
+        failure_ratio = self.failures / self.outcomes
+        timeout_ratio = self.timeouts / self.outcomes
+        stats = (f"{self.outcomes - self.failures}/{self.outcomes} ok, {self.timeouts} timeouts, median "
+                 + ", ".join(f"{part} {median:.1f}s" for part, median in sorted(medians.items())))
+        if failure_ratio > MAX_FAILURE_RATIO:
+            problem = "failures"
+        elif timeout_ratio > MAX_TIMEOUT_RATIO:
+            problem = "timeouts"
+        else:
+            problem = slow
+        new_rate = self.clamp(rate * self.factor if problem else rate + self.step)
+        if abs(new_rate - rate) < 1e-9:
+            return None
+        reason = f"{problem}: {stats}" if problem else f"healthy: {stats}"
+        return new_rate, reason
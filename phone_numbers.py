@@ -0,0 +1,138 @@
+# ----------------------- Phone Number Normalization -----------------------
+# Whole-chunk (vectorized) normalization to E.164 and validation against a table of
+# country calling codes, so malformed numbers are rejected before any browser time
+# is spent on them. Codes missing from the table only get the generic E.164 check.
+
+# Calling code -> (min, max) length of the national significant number
+COUNTRY_CODES = {
+    "1": (10, 10),      # US / Canada / NANP
+    "7": (10, 10),      # Russia / Kazakhstan
+    "20": (10, 10),     # Egypt
+    "27": (9, 9),       # South Africa
+    "30": (10, 10),     # Greece
+    "31": (9, 9),       # Netherlands
+    "32": (8, 9),       # Belgium
+    "33": (9, 9),       # France
+    "34": (9, 9),       # Spain
+    "36": (8, 9),       # Hungary
+    "39": (6, 11),      # Italy
+    "40": (9, 9),       # Romania
+    "41": (9, 9),       # Switzerland
+    "43": (4, 13),      # Austria
+    "44": (10, 10),     # United Kingdom
+    "45": (8, 8),       # Denmark
+    "46": (7, 13),      # Sweden
+    "47": (8, 8),       # Norway
+    "48": (9, 9),       # Poland
+    "49": (6, 13),      # Germany
+    "51": (8, 9),       # Peru
+    "52": (10, 10),     # Mexico
+    "54": (10, 11),     # Argentina
+    "55": (10, 11),     # Brazil
+    "56": (9, 9),       # Chile
+    "57": (10, 10),     # Colombia
+    "58": (10, 10),     # Venezuela
+    "60": (8, 10),      # Malaysia
+    "61": (9, 9),       # Australia
+    "62": (8, 12),      # Indonesia
+    "63": (10, 10),     # Philippines
+    "64": (8, 10),      # New Zealand
+    "65": (8, 8),       # Singapore
+    "66": (8, 9),       # Thailand
+    "81": (9, 10),      # Japan
+    "82": (8, 10),      # South Korea
+    "84": (9, 10),      # Vietnam
+    "86": (11, 11),     # China
+    "90": (10, 10),     # Turkey
+    "91": (10, 10),     # India
+    "92": (10, 10),     # Pakistan
+    "93": (9, 9),       # Afghanistan
+    "94": (9, 9),       # Sri Lanka
+    "95": (8, 10),      # Myanmar
+    "98": (10, 10),     # Iran
+    "212": (9, 9),      # Morocco
+    "213": (9, 9),      # Algeria
+    "216": (8, 8),      # Tunisia
+    "218": (9, 9),      # Libya
+    "234": (10, 10),    # Nigeria
+    "249": (9, 9),      # Sudan
+    "251": (9, 9),      # Ethiopia
+    "254": (9, 9),      # Kenya
+    "255": (9, 9),      # Tanzania
+    "256": (9, 9),      # Uganda
+    "351": (9, 9),      # Portugal
+    "353": (7, 9),      # Ireland
+    "380": (9, 9),      # Ukraine
+    "880": (10, 10),    # Bangladesh
+    "961": (7, 8),      # Lebanon
+    "962": (8, 9),      # Jordan
+    "963": (9, 9),      # Syria
+    "964": (10, 10),    # Iraq
+    "965": (8, 8),      # Kuwait
+    "966": (9, 9),      # Saudi Arabia
+    "967": (9, 9),      # Yemen
+    "968": (8, 8),      # Oman
+    "970": (9, 9),      # Palestine
+    "971": (8, 9),      # United Arab Emirates
+    "972": (8, 9),      # Israel
+    "973": (8, 8),      # Bahrain
+    "974": (8, 8),      # Qatar
+}
+# E.164 bounds for codes not in the table
+E164_MIN_DIGITS = 8
+E164_MAX_DIGITS = 15
+
+def normalize_numbers(values, default_code):
+    # Returns (numbers, errors): "+<digits>" per input and None or a rejection reason
+    import numpy as np
+    import pandas as pd
+
+    default_digits = "".join(ch for ch in str(default_code) if ch.isdigit())
+    raw = pd.Series(list(values), dtype=object).fillna("").astype(str).str.strip()
+    # Numeric spreadsheet cells arrive as "201001234567.0"
+    raw = raw.str.replace(r"\.0$", "", regex=True)
+    has_plus = raw.str.startswith("+")
+    digits = raw.str.replace(r"\D", "", regex=True)
+
+    # 00 is the international call prefix: 0044... is +44...
+    intl_prefix = ~has_plus & digits.str.startswith("00")
+    digits = digits.where(~intl_prefix, digits.str[2:])
+    international = has_plus | intl_prefix
+    empty = digits == ""
+
+    # National numbers: drop the trunk zero(s) and add the default country code, unless the
+    # number already carries that code (e.g. 201001234567 with default +20)
+    national = ~international
+    trimmed = digits.str.replace(r"^0+", "", regex=True)
+    bounds = COUNTRY_CODES.get(default_digits)
+    if bounds:
+        national_len = trimmed.str.len() - len(default_digits)
+        already_prefixed = (national & trimmed.str.startswith(default_digits)
+                            & national_len.between(*bounds) & ~trimmed.str.len().between(*bounds))
+    else:
+        already_prefixed = pd.Series(False, index=digits.index)
+    digits = digits.where(~national, np.where(already_prefixed, trimmed, default_digits + trimmed))
+
+    # Validation: known calling code with a national number of the right length,
+    # otherwise the generic E.164 length limits. Calling codes are prefix-free, so at
+    # most one of the 1-3 digit prefixes matches.
+    codes = pd.Series(None, index=digits.index, dtype=object)
+    for length in (1, 2, 3):
+        prefix = digits.str[:length]
+        codes = codes.where(codes.notna() | ~prefix.isin(COUNTRY_CODES.keys()), prefix)
+    total = digits.str.len()
+    national_length = total - codes.fillna("").str.len()
+    min_len = codes.map({code: bounds[0] for code, bounds in COUNTRY_CODES.items()})
+    max_len = codes.map({code: bounds[1] for code, bounds in COUNTRY_CODES.items()})
+
+    errors = pd.Series(None, index=digits.index, dtype=object)
+    known = codes.notna()
+    errors[known & (national_length < min_len)] = "too short for its country code"
+    errors[known & (national_length > max_len)] = "too long for its country code"
+    errors[~known & (total < E164_MIN_DIGITS)] = "too short"
+    errors[~known & (total > E164_MAX_DIGITS)] = "too long"
+    errors[empty] = "empty"
+    errors[raw.str.contains(r"[A-Za-z]", regex=True)] = "contains letters"
+
+    numbers = "+" + digits
+    return numbers.tolist(), [error if isinstance(error, str) else None for error in errors.tolist()]
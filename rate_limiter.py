@@ -0,0 +1,110 @@
+import threading
+import time
+
+# ----------------------- Rate Limiter -----------------------
+# Token buckets pace the sends: one bucket per session (each session is its own linked
+# account) and an optional one shared by all of them. A send takes a token from both;
+# tokens refill continuously at the configured rate up to `burst`. Time spent sending
+# counts toward the interval, so a row that took longer than the spacing goes out at
+# once, and nothing sleeps longer than the missing budget. Rates can be changed while
+# a campaign runs; waiting workers re-evaluate immediately.
+
+def rate_from_delay(delay_between):
+    # Legacy "seconds between messages" -> messages per minute (0: unlimited)
+    return 60.0 / delay_between if delay_between and delay_between > 0 else 0
+
+class TokenBucket:
+    def __init__(self, per_minute, burst=1):
+        self.per_second = max(0.0, float(per_minute or 0)) / 60
+        self.capacity = max(1.0, float(burst or 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self):
+        return self.per_second <= 0
+
+    def refill(self, now):
+        if not self.unlimited:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_second)
+        self.updated = now
+
+    def wait_time(self, now):
+        # Seconds until a token is available (0 if one is there now)
+        self.refill(now)
+        if self.unlimited or self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.per_second
+
+    def take(self):
+        if not self.unlimited:
+            self.tokens -= 1
+
+    def configure(self, per_minute, burst, now):
+        self.refill(now)
+        self.per_second = max(0.0, float(per_minute or 0)) / 60
+        self.capacity = max(1.0, float(burst or 1))
+        self.tokens = min(self.tokens, self.capacity)
+
+class RateLimiter:
+    def __init__(self, per_minute, burst=1, global_per_minute=0):
+        self.per_minute = per_minute
+        self.burst = burst
+        self.global_per_minute = global_per_minute
+        self.cond = threading.Condition()
+        self.buckets = {}
+        self.global_bucket = TokenBucket(global_per_minute, burst)
+        self.cancelled = False
+
+    def bucket(self, key):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.per_minute, self.burst)
+        return bucket
+
+    def acquire(self, key):
+        # Blocks until both the session's and the shared bucket have a token and takes
+        # them. False if the limiter was cancelled (stop) while waiting.
+        with self.cond:
+            while not self.cancelled:
+                now = time.monotonic()
+                bucket = self.bucket(key)
+                wait = max(bucket.wait_time(now), self.global_bucket.wait_time(now))
+                if wait <= 0:
+                    bucket.take()
+                    self.global_bucket.take()
+                    return True
+                self.cond.wait(wait)
+            return False
+
+    def set_rate(self, per_minute=None, burst=None, global_per_minute=None):
+        with self.cond:
+            if per_minute is not None:
+                self.per_minute = per_minute
+            if burst is not None:
+                self.burst = burst
+            if global_per_minute is not None:
+                self.global_per_minute = global_per_minute
+            now = time.monotonic()
+            for bucket in self.buckets.values():
+                bucket.configure(self.per_minute, self.burst, now)
+            self.global_bucket.configure(self.global_per_minute, self.burst, now)
+            self.cond.notify_all()
+
+    def reset(self):
+        # Fresh buckets for a new run
+        with self.cond:
+            self.cancelled = False
+            self.buckets.clear()
+            self.global_bucket = TokenBucket(self.global_per_minute, self.burst)
+
+    def cancel(self):
+        with self.cond:
+            self.cancelled = True
+            self.cond.notify_all()
+
+    def describe(self):
+        def rate(per_minute):
+            return f"{per_minute:g}/min" if per_minute else "unlimited"
+        text = f"{rate(self.per_minute)} per account, burst {self.burst:g}"
+        return f"{text}, {rate(self.global_per_minute)} overall" if self.global_per_minute else text
@@ -0,0 +1,139 @@
+import heapq
+import itertools
+import pickle
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# ----------------------- Scheduled Work Queue -----------------------
+# Work queue shared by the session workers. Unscheduled rows go through a bounded FIFO
+# (so the contact reader can't run ahead of the browsers); rows with a future Schedule
+# time are parked in a min-heap keyed by release time and handed out once due, ahead of
+# the FIFO. A row scheduled for 18:00 therefore never holds up the rows after it.
+# The heap is bounded too (max_scheduled): producers only park rows that are due soon
+# and block while it is full (see SessionPool.release_scheduled). Workers sleep on a
+# condition until the next release time or new work, never polling.
+
+class ScheduledWorkQueue:
+    def __init__(self, maxsize, max_scheduled=None):
+        self.maxsize = max(1, int(maxsize))
+        self.max_scheduled = max(1, int(max_scheduled or self.maxsize))
+        self.cond = threading.Condition()
+        self.ready = deque()
+        self.scheduled = []  # (release_at, seq, item)
+        self.seq = itertools.count()
+        self.closed = False    # no more rows will be added
+        self.cancelled = False  # stop: drop everything that has not been handed out
+
+    def put(self, item, release_at=None, timeout=None):
+        # release_at: epoch seconds, None for "now". False if the FIFO (or, for a future
+        # release, the heap) stayed full for `timeout`.
+        with self.cond:
+            if release_at is not None and release_at > time.time():
+                if not self.cond.wait_for(lambda: len(self.scheduled) < self.max_scheduled or self.cancelled,
+                                          timeout):
+                    return False
+                if not self.cancelled:
+                    heapq.heappush(self.scheduled, (release_at, next(self.seq), item))
+                    self.cond.notify_all()
+                return True
+            if not self.cond.wait_for(lambda: len(self.ready) < self.maxsize or self.cancelled, timeout):
+                return False
+            if not self.cancelled:
+                self.ready.append(item)
+                self.cond.notify_all()
+            return True
+
+    def get(self):
+        # Next due item, or None once the queue is closed and empty (or cancelled)
+        with self.cond:
+            while True:
+                if self.cancelled:
+                    return None
+                now = time.time()
+                if self.scheduled and self.scheduled[0][0] <= now:
+                    item = heapq.heappop(self.scheduled)[2]
+                    self.cond.notify_all()
+                    return item
+                if self.ready:
+                    item = self.ready.popleft()
+                    self.cond.notify_all()
+                    return item
+                if self.closed and not self.scheduled:
+                    return None
+                self.cond.wait(self.scheduled[0][0] - now if self.scheduled else None)
+
+    def wait_cancelled(self, timeout):
+        # Sleeps up to `timeout` seconds; True as soon as the queue is cancelled
+        with self.cond:
+            return self.cond.wait_for(lambda: self.cancelled, max(0.0, timeout))
+
+    def scheduled_count(self):
+        with self.cond:
+            return len(self.scheduled)
+
+    def next_release(self):
+        with self.cond:
+            return self.scheduled[0][0] if self.scheduled else None
+
+    def __len__(self):
+        with self.cond:
+            return len(self.ready) + len(self.scheduled)
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def cancel(self):
+        with self.cond:
+            self.cancelled = True
+            self.ready.clear()
+            self.scheduled.clear()
+            self.cond.notify_all()
+
+# ----------------------- Deferred Row Spool -----------------------
+# Scheduled rows due long after the release horizon are kept out of memory: they are
+# pickled into a private temporary SQLite database keyed by row index, and taken back
+# out by index when their release wave comes up. Nothing is re-read from the sheet.
+
+SPOOL_BATCH = 500  # indices per IN (...) query, well below SQLite's parameter limit
+
+class RowSpool:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # An empty file name opens an on-disk database that SQLite deletes on close
+        self.conn = sqlite3.connect("", check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("CREATE TABLE rows (idx INTEGER PRIMARY KEY, row BLOB NOT NULL)")
+        self.count = 0
+
+    def put(self, index, row):
+        with self.lock:
+            self.conn.execute("INSERT INTO rows VALUES (?, ?)",
+                              (index, pickle.dumps(row, pickle.HIGHEST_PROTOCOL)))
+            self.count += 1
+
+    def take(self, indices):
+        # The spooled rows among `indices` as (index, row), removed from the spool
+        taken = []
+        with self.lock:
+            for start in range(0, len(indices), SPOOL_BATCH):
+                batch = list(indices[start:start + SPOOL_BATCH])
+                marks = ",".join("?" * len(batch))
+                found = self.conn.execute(f"SELECT idx, row FROM rows WHERE idx IN ({marks})", batch).fetchall()
+                if found:
+                    self.conn.execute(f"DELETE FROM rows WHERE idx IN ({marks})", batch)
+                    taken.extend((index, pickle.loads(row)) for index, row in found)
+            self.count -= len(taken)
+        return taken
+
+    def __len__(self):
+        with self.lock:
+            return self.count
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
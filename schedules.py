@@ -0,0 +1,171 @@
+import logging
+from array import array
+from datetime import datetime, time as dt_time, timedelta, timezone
+
+# ----------------------- Schedules -----------------------
+# The Schedule column (and the global start time) accepts:
+#   18:30 / 18:30:00                  next occurrence of that time of day
+#   2026-11-02 18:30 / 2026-11-02T18:30:00
+#   2026-11-02T18:30:00+02:00 / ...Z  explicit UTC offset
+# optionally followed by a timezone name, e.g. "2026-11-02 09:00 Europe/London" or
+# "09:00 Asia/Riyadh". Without a name or offset the campaign's schedule timezone
+# applies: "" (this computer), "recipient" (inferred from each number's country code)
+# or any IANA name. Release times are precomputed per campaign into a ReleasePlan.
+
+SCHEDULE_TIMEZONE_LOCAL = ""
+SCHEDULE_TIMEZONE_RECIPIENT = "recipient"
+
+# Calling code -> timezone; countries spanning several zones use their most populous one
+COUNTRY_TIMEZONES = {
+    "1": "America/New_York", "7": "Europe/Moscow", "20": "Africa/Cairo", "27": "Africa/Johannesburg",
+    "30": "Europe/Athens", "31": "Europe/Amsterdam", "32": "Europe/Brussels", "33": "Europe/Paris",
+    "34": "Europe/Madrid", "36": "Europe/Budapest", "39": "Europe/Rome", "40": "Europe/Bucharest",
+    "41": "Europe/Zurich", "43": "Europe/Vienna", "44": "Europe/London", "45": "Europe/Copenhagen",
+    "46": "Europe/Stockholm", "47": "Europe/Oslo", "48": "Europe/Warsaw", "49": "Europe/Berlin",
+    "51": "America/Lima", "52": "America/Mexico_City", "54": "America/Argentina/Buenos_Aires",
+    "55": "America/Sao_Paulo", "56": "America/Santiago", "57": "America/Bogota", "58": "America/Caracas",
+    "60": "Asia/Kuala_Lumpur", "61": "Australia/Sydney", "62": "Asia/Jakarta", "63": "Asia/Manila",
+    "64": "Pacific/Auckland", "65": "Asia/Singapore", "66": "Asia/Bangkok", "81": "Asia/Tokyo",
+    "82": "Asia/Seoul", "84": "Asia/Ho_Chi_Minh", "86": "Asia/Shanghai", "90": "Europe/Istanbul",
+    "91": "Asia/Kolkata", "92": "Asia/Karachi", "93": "Asia/Kabul", "94": "Asia/Colombo",
+    "95": "Asia/Yangon", "98": "Asia/Tehran", "212": "Africa/Casablanca", "213": "Africa/Algiers",
+    "216": "Africa/Tunis", "218": "Africa/Tripoli", "234": "Africa/Lagos", "249": "Africa/Khartoum",
+    "251": "Africa/Addis_Ababa", "254": "Africa/Nairobi", "255": "Africa/Dar_es_Salaam",
+    "256": "Africa/Kampala", "351": "Europe/Lisbon", "353": "Europe/Dublin", "380": "Europe/Kyiv",
+    "880": "Asia/Dhaka", "961": "Asia/Beirut", "962": "Asia/Amman", "963": "Asia/Damascus",
+    "964": "Asia/Baghdad", "965": "Asia/Kuwait", "966": "Asia/Riyadh", "967": "Asia/Aden",
+    "968": "Asia/Muscat", "970": "Asia/Gaza", "971": "Asia/Dubai", "972": "Asia/Jerusalem",
+    "973": "Asia/Bahrain", "974": "Asia/Qatar",
+}
+
+class ScheduleError(ValueError):
+    pass
+
+_zones = {}
+
+def get_timezone(name):
+    # None for this computer's local time
+    if not name:
+        return None
+    zone = _zones.get(name)
+    if zone is None:
+        from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+        try:
+            zone = ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError) as e:
+            # Windows has no system tz database: pip install tzdata
+            raise ScheduleError(f"Unknown timezone: {name}") from e
+        _zones[name] = zone
+    return zone
+
+def timezone_for_number(number):
+    # "+447911123456" -> "Europe/London"; None when the calling code is not in the table
+    digits = str(number).lstrip("+")
+    for length in (1, 2, 3):
+        name = COUNTRY_TIMEZONES.get(digits[:length])
+        if name:
+            return name
+    return None
+
+def split_timezone(text):
+    # "2026-11-02 09:00 Europe/London" -> ("2026-11-02 09:00", "Europe/London")
+    head, _, last = text.rpartition(" ")
+    if head and ("/" in last or last.upper() == "UTC"):
+        return head.strip(), last
+    return text, None
+
+def localize(naive, zone):
+    return naive.replace(tzinfo=zone) if zone is not None else naive.astimezone()
+
+def parse_schedule(value, now=None, default_timezone=None):
+    # Timezone-aware datetime for a Schedule value; times of day roll over to the next day
+    now = now or datetime.now(timezone.utc)
+    if isinstance(value, datetime):
+        text, zone_name = None, None
+        parsed = value
+    elif isinstance(value, dt_time):
+        text, zone_name = None, None
+        parsed = value
+    else:
+        text, zone_name = split_timezone(str(value).strip())
+        if not text:
+            raise ScheduleError("Empty schedule")
+        parsed = None
+    zone = get_timezone(zone_name or default_timezone)
+
+    if parsed is None:
+        for fmt in ("%H:%M:%S", "%H:%M"):
+            try:
+                parsed = datetime.strptime(text, fmt).time()
+                break
+            except ValueError:
+                pass
+    if parsed is None:
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00") if text.endswith("Z") else text)
+        except ValueError:
+            raise ScheduleError(f"Unrecognized schedule: {value}") from None
+
+    if isinstance(parsed, dt_time):
+        # Next occurrence of that wall-clock time in the target zone
+        local_now = now.astimezone(zone) if zone is not None else now.astimezone()
+        candidate = localize(datetime.combine(local_now.date(), parsed.replace(tzinfo=None)), zone)
+        if candidate < now:
+            candidate = localize(datetime.combine(local_now.date() + timedelta(days=1),
+                                                  parsed.replace(tzinfo=None)), zone)
+        return candidate
+    if parsed.tzinfo is None:
+        return localize(parsed, zone)
+    return parsed
+
+class ReleasePlan:
+    # Release time (epoch seconds) for every scheduled row of a campaign, computed once
+    # up front and kept sorted; unscheduled rows are not stored
+    def __init__(self):
+        self.indices = array("q")
+        self.times = array("d")
+        self.by_index = {}
+        self.errors = 0
+
+    @classmethod
+    def build(cls, rows, timezone_setting="", now=None):
+        # rows: (index, number, schedule value) for every row with a schedule
+        plan = cls()
+        now = now or datetime.now(timezone.utc)
+        entries = []
+        for index, number, value in rows:
+            if timezone_setting == SCHEDULE_TIMEZONE_RECIPIENT:
+                default_timezone = timezone_for_number(number)
+            else:
+                default_timezone = timezone_setting or None
+            try:
+                entries.append((parse_schedule(value, now, default_timezone).timestamp(), index))
+            except ScheduleError as e:
+                plan.errors += 1
+                logging.warning(f"Row {index + 1}: {e}. Sending without waiting.")
+        entries.sort()
+        for release_at, index in entries:
+            plan.indices.append(index)
+            plan.times.append(release_at)
+            plan.by_index[index] = release_at
+        return plan
+
+    def __len__(self):
+        return len(self.times)
+
+    def release_at(self, index):
+        return self.by_index.get(index)
+
+    def summary_lines(self):
+        # First/last release and the number of releases per day, in local time
+        if not self.times:
+            return []
+        first = datetime.fromtimestamp(self.times[0])
+        last = datetime.fromtimestamp(self.times[-1])
+        per_day = {}
+        for release_at in self.times:
+            day = datetime.fromtimestamp(release_at).date()
+            per_day[day] = per_day.get(day, 0) + 1
+        lines = [f"Release plan: {len(self.times)} scheduled rows from {first:%Y-%m-%d %H:%M} to {last:%Y-%m-%d %H:%M}"]
+        lines += [f"  {day:%a %Y-%m-%d}: {count} rows" for day, count in sorted(per_day.items())]
+        return lines
@@ -0,0 +1,709 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+from cancellation import CancelToken, Cancelled
+from pacing import PacingController
+from rate_limiter import RateLimiter, rate_from_delay
+from send_metrics import StageMetrics
+
+# No GUI and no heavy imports at module level: workers, cron jobs and tests can
+# import the engine without a display. pandas and selenium are loaded on first use.
+
+REQUIRED_COLUMNS = ['Number', 'Message']
+MEDIA_COLUMNS = ("Image", "Video", "File")
+STATUS_COLUMNS = ("Number", "Text", "Image", "Video", "File", "Schedule")
+METRICS_FILE_INTERVAL = 10
+
+# ----------------------- Helper Functions -----------------------
+def format_phone_number(num, default_code):
+    from phone_numbers import normalize_numbers
+    numbers, _ = normalize_numbers([num], default_code)
+    return numbers[0]
+
+def cell_text(row, column):
+    # Stripped string value of a sheet cell, "" for missing/NaN cells
+    value = row.get(column)
+    if value is None or value != value:
+        return ""
+    return str(value).strip()
+
+# ----------------------- Engine Listener -----------------------
+class EngineListener:
+    # Front-ends (the Tk window, a CLI, a worker) subclass this and override what they need.
+    # Set `prompt` to a callable(title, message) that blocks until the user confirms
+    # the QR login; leave it None to have the bot wait for the chat list instead.
+    prompt = None
+
+    def on_log(self, msg):
+        pass
+
+    def on_contacts_loaded(self, contacts):
+        # Called once per parsed chunk with (index, number, schedule) tuples to append
+        pass
+
+    def on_status(self, index, column, value):
+        pass
+
+    def on_progress(self, engine):
+        pass
+
+    def on_error(self, title, message):
+        pass
+
+    def on_finished(self, engine):
+        pass
+
+# ----------------------- Bulk Send Engine -----------------------
+class BulkSendEngine:
+    # Bot class used for every session; None means whatsapp_client.WhatsAppBot
+    bot_class = None
+
+    def __init__(self, default_code, delay_between, wait_timeout, browser_choice, max_retries,
+                 persistent_session=False, schedule_time="", resume=False, headless=False,
+                 navigation="in_app", stage_timeouts=None, sessions=1, journal_file=None,
+                 suppression_list="", skip_duplicates=True, metrics_port=0, metrics_file="",
+                 base_url=None, schedule_timezone="", rate_per_minute=None, burst=1,
+                 global_rate_per_minute=0, adaptive_pacing=False, min_rate_per_minute=2,
+                 max_rate_per_minute=60, media_captions=True, media_preprocessing=True,
+                 media_cache_dir="", listener=None):
+        self.default_code = default_code
+        self.delay_between = delay_between
+        self.wait_timeout = wait_timeout
+        self.browser_choice = browser_choice
+        self.max_retries = max_retries
+        self.persistent_session = persistent_session
+        self.schedule_time = schedule_time
+        self.resume = resume
+        self.headless = headless
+        self.navigation = navigation
+        self.stage_timeouts = stage_timeouts
+        self.sessions = max(1, int(sessions))
+        self.journal_file = journal_file
+        self.suppression_list = suppression_list
+        self.skip_duplicates = skip_duplicates
+        self.metrics_port = int(metrics_port or 0)
+        self.metrics_file = metrics_file
+        self.base_url = base_url
+        self.schedule_timezone = (schedule_timezone or "").strip()
+        self.media_captions = media_captions
+        self.media_preprocessing = media_preprocessing
+        self.media_cache_dir = media_cache_dir
+        # Pacing: messages per minute per account (derived from delay_between unless given),
+        # burst size, and an optional cap over all sessions together
+        if rate_per_minute is None:
+            rate_per_minute = rate_from_delay(delay_between)
+        self.limiter = RateLimiter(rate_per_minute, burst, global_rate_per_minute)
+        # Adaptive pacing moves the per-account rate within [min, max] based on outcomes
+        self.pacing = None
+        if adaptive_pacing:
+            self.pacing = PacingController(min_rate_per_minute, max_rate_per_minute)
+            self.limiter.set_rate(self.pacing.initial_rate(rate_per_minute))
+        self.listener = listener or EngineListener()
+
+        self.messages_sent = 0
+        self.messages_failed = 0
+        self.messages_skipped = 0
+        self.total_contacts = 0
+        self.rows_read = 0
+        self.start_time = None
+        self.counter_lock = threading.Lock()
+        # Stop/pause for this campaign; every wait in the engine, pool and bots sleeps on it
+        self.cancel_token = CancelToken()
+        self.pool = None
+        self.suppressed = None
+        self.journal = None
+        self.sent_parts = {}
+        self.plan = None
+        self.assets = None
+        self.media = None
+        self.metrics = StageMetrics()
+        self.metrics_lock = threading.Lock()
+        self.metrics_written = 0
+
+    # ----- Control -----
+    def request_stop(self):
+        self.cancel_token.cancel()
+        self.limiter.cancel()
+        if self.pool is not None:
+            self.pool.cancel()
+
+    def set_rate(self, per_minute=None, burst=None, global_per_minute=None):
+        # Safe to call from any thread while a campaign runs
+        self.limiter.set_rate(per_minute, burst, global_per_minute)
+        self.metrics.set_gauge("rate_per_minute", self.limiter.per_minute, "Current per-account sending rate.")
+        self.log(f"Sending rate set to {self.limiter.describe()}")
+
+    def pause(self):
+        self.cancel_token.pause()
+
+    def resume_sending(self):
+        self.cancel_token.resume()
+
+    @property
+    def paused(self):
+        return self.cancel_token.paused
+
+    @property
+    def stop_requested(self):
+        return self.cancel_token.cancelled
+
+    # ----- Progress -----
+    @property
+    def processed(self):
+        return self.messages_sent + self.messages_failed + self.messages_skipped
+
+    def progress_percent(self):
+        with self.counter_lock:
+            return int(100 * self.processed / self.total_contacts) if self.total_contacts > 0 else 0
+
+    def estimated_remaining(self):
+        # Seconds left at the average pace so far, None until the first contact is done
+        with self.counter_lock:
+            processed = self.processed
+            if not self.start_time or processed == 0:
+                return None
+            avg_time = (time.time() - self.start_time) / processed
+            return (self.total_contacts - processed) * avg_time
+
+    def log(self, msg):
+        logging.info(msg)
+        self.listener.on_log(msg)
+
+    # ----- Scheduling -----
+    def wait_for_schedule(self, schedule_str):
+        from schedules import SCHEDULE_TIMEZONE_RECIPIENT, parse_schedule
+        # A global start time has no recipient: "recipient" falls back to local time
+        zone = "" if self.schedule_timezone == SCHEDULE_TIMEZONE_RECIPIENT else self.schedule_timezone
+        try:
+            scheduled_time = parse_schedule(schedule_str, default_timezone=zone)
+            delay = scheduled_time.timestamp() - time.time()
+            self.log(f"Global schedule: waiting until {scheduled_time.astimezone():%Y-%m-%d %H:%M:%S} (in {int(delay)} seconds)")
+            self.cancel_token.wait(delay)
+        except Exception as e:
+            logging.exception("Error parsing global scheduled time. Continuing immediately.")
+
+    def scan_contacts(self, file_path, columns):
+        # Schedule and media columns both need the whole sheet before the first send: the
+        # release plan (per-recipient timezones included) and the media registry are built
+        # in one shared pass. Sheets with neither column are not read ahead at all.
+        from schedules import ReleasePlan, SCHEDULE_TIMEZONE_RECIPIENT
+        from contact_sources import open_contact_source
+        from phone_numbers import normalize_numbers
+        self.plan = None
+        self.assets = None
+        scheduled = "Schedule" in columns
+        media_columns = [column for column in MEDIA_COLUMNS if column in columns]
+        if not scheduled and not media_columns:
+            return
+        registry = self.new_media_registry(file_path) if media_columns else None
+
+        def scheduled_rows():
+            for chunk in open_contact_source(file_path).chunks():
+                if registry is not None:
+                    for index, row in chunk:
+                        done = self.sent_parts.get(index, ())
+                        for column in media_columns:
+                            path = cell_text(row, column)
+                            if path and column not in done:
+                                registry.add(column, path)
+                if not scheduled:
+                    continue
+                chunk = [(index, row) for index, row in chunk if cell_text(row, "Schedule")]
+                if not chunk:
+                    continue
+                if self.schedule_timezone == SCHEDULE_TIMEZONE_RECIPIENT:
+                    numbers, _ = normalize_numbers([row.get("Number") for _, row in chunk], self.default_code)
+                else:
+                    numbers = [""] * len(chunk)
+                for (index, row), number in zip(chunk, numbers):
+                    yield index, number, cell_text(row, "Schedule")
+
+        try:
+            plan = ReleasePlan.build(scheduled_rows(), self.schedule_timezone)
+        except Exception as e:
+            logging.exception("Error reading the contact list ahead of sending. "
+                              "Scheduled rows are sent immediately and media files unchecked.")
+            return
+        if scheduled:
+            self.plan = plan
+            for line in plan.summary_lines():
+                self.log(line)
+            if plan.errors:
+                self.log(f"{plan.errors} rows have an unreadable Schedule and are sent without waiting")
+        if registry is not None:
+            self.check_media(registry)
+
+    def release_time(self, index, row):
+        # Epoch seconds at which the row may be sent, None to send it right away
+        return self.plan.release_at(index) if self.plan is not None else None
+
+    # ----- Contacts -----
+    def open_contacts(self, file_path):
+        from contact_sources import open_contact_source, ContactSourceError
+        try:
+            source = open_contact_source(file_path)
+        except ContactSourceError as e:
+            logging.exception("Error reading contact list.")
+            self.listener.on_error("Error", str(e))
+            return None
+        except Exception as e:
+            logging.exception("Error reading contact list.")
+            self.listener.on_error("Error", "Error reading contact list")
+            return None
+        if not all(col in source.columns for col in REQUIRED_COLUMNS):
+            self.listener.on_error("Error", f"Contact list must contain at least {REQUIRED_COLUMNS} columns")
+            return None
+        return source
+
+    def read_contacts(self, source):
+        # Streams (index, row) pairs chunk by chunk; the GUI gets each chunk as soon as it is parsed
+        self.total_contacts = source.estimated_rows or 0
+        self.rows_read = 0
+        from phone_numbers import normalize_numbers
+        from suppression import DuplicateFilter
+        duplicates = DuplicateFilter() if self.skip_duplicates else None
+        for chunk in source.chunks():
+            numbers, errors = normalize_numbers([row.get("Number") for _, row in chunk], self.default_code)
+            for (_, row), number in zip(chunk, numbers):
+                row["Number"] = number
+            self.rows_read += len(chunk)
+            self.total_contacts = max(self.total_contacts, self.rows_read)
+            self.listener.on_contacts_loaded(
+                [(index, row["Number"], cell_text(row, "Schedule")) for index, row in chunk])
+            for (index, row), error in zip(chunk, errors):
+                number = row["Number"]
+                if error:
+                    self.reject_row(index, row, "Invalid", f"Skipping row {index + 1}: {number} is invalid ({error})")
+                elif self.suppressed is not None and number in self.suppressed:
+                    self.reject_row(index, row, "Suppressed", f"Skipping row {index + 1}: {number} opted out", failed=False)
+                elif duplicates is not None and duplicates.check_and_add(number):
+                    self.reject_row(index, row, "Duplicate", f"Skipping row {index + 1}: {number} already in this campaign", failed=False)
+                else:
+                    yield index, row
+        self.total_contacts = self.rows_read
+        self.listener.on_progress(self)
+
+    def reject_row(self, index, row, status, reason, failed=True):
+        # Rows filtered out before sending: no browser time spent. Invalid numbers count
+        # as failed, opted-out and repeated recipients as skipped.
+        self.log(reason)
+        for part, _ in self.row_parts(row):
+            self.listener.on_status(index, part, status)
+        with self.counter_lock:
+            if failed:
+                self.messages_failed += 1
+            else:
+                self.messages_skipped += 1
+        self.listener.on_progress(self)
+
+    def open_suppression(self):
+        self.suppressed = None
+        if not self.suppression_list:
+            return True
+        from suppression import open_suppression_index
+        try:
+            self.suppressed = open_suppression_index(self.suppression_list, self.default_code)
+        except Exception as e:
+            logging.exception("Error loading suppression list.")
+            self.listener.on_error("Error", f"Error loading suppression list: {e}")
+            return False
+        self.log(f"Suppression list: {len(self.suppressed)} opted-out numbers")
+        return True
+
+    def open_journal(self, file_path):
+        from send_journal import SendJournal, JOURNAL_FILE, campaign_id
+        self.journal = SendJournal(self.journal_file or JOURNAL_FILE)
+        self.journal.begin(campaign_id(file_path), self.resume)
+        self.sent_parts = self.journal.sent_parts() if self.resume else {}
+        if self.sent_parts:
+            self.log(f"Resuming: {sum(len(parts) for parts in self.sent_parts.values())} parts already sent "
+                     f"to {len(self.sent_parts)} contacts will be skipped")
+
+    # ----- Media -----
+    def new_media_registry(self, file_path):
+        from media_assets import MediaRegistry
+        from media_prep import MEDIA_CACHE_DIR, preprocessable_types
+        # Only types the preprocessor can actually shrink are exempt from the size limits
+        shrinkable = preprocessable_types() if self.media_preprocessing else set()
+        return MediaRegistry(os.path.dirname(os.path.abspath(file_path)),
+                             os.path.join(self.media_cache_dir or MEDIA_CACHE_DIR, "assets"), shrinkable)
+
+    def check_media(self, registry):
+        # Every distinct media path of the rows still to send (collected by scan_contacts)
+        # is resolved, checked and hashed once before sending; files that can't be sent
+        # are reported now
+        try:
+            problems = registry.check()
+        except Exception as e:
+            logging.exception("Error checking media files. Sending them unchecked.")
+            return
+        self.assets = registry
+        for line in registry.summary_lines():
+            self.log(line)
+        if problems:
+            lines = [f"{asset.media_type} '{asset.path}': {asset.problem} ({asset.rows} rows)" for asset in problems]
+            for line in lines:
+                self.log(line)
+            more = f"\n... and {len(lines) - 10} more (see the log)" if len(lines) > 10 else ""
+            self.listener.on_error("Media Problems", "These files can't be sent, their parts will be marked Failed:\n"
+                                   + "\n".join(lines[:10]) + more)
+
+    def start_media_prep(self):
+        # Checked images and videos go to the preprocessing pool in sheet order, so they
+        # are ready by the time the sender gets to their rows
+        self.media = None
+        if not self.media_preprocessing or self.assets is None:
+            return
+        from media_prep import MediaPreprocessor, MEDIA_CACHE_DIR
+        media_types = {asset.media_type for asset in self.assets.assets.values() if not asset.problem}
+        tools = {"Image": "Pillow is not installed", "Video": "ffmpeg/ffprobe are not on PATH"}
+        for media_type, reason in tools.items():
+            if media_type in media_types and media_type not in self.assets.shrinkable:
+                self.log(f"{media_type}s are sent as they are: {reason}")
+        assets = [asset for asset in self.assets.assets.values()
+                  if asset.media_type in self.assets.shrinkable and not asset.problem]
+        if not assets:
+            return
+        self.media = MediaPreprocessor(self.media_cache_dir or MEDIA_CACHE_DIR, log=self.log)
+        for asset in assets:
+            self.media.submit(asset.path, asset.media_type, asset.upload_path, asset.sha256)
+
+    def upload_path(self, part, value):
+        # File to upload for a sheet path: its local copy and/or preprocessed version
+        asset = self.assets.get(part, value) if self.assets is not None else None
+        if asset is None:
+            return value
+        # Only checked images and videos were handed to the preprocessor
+        if self.media is not None and self.media.submitted(value, part):
+            return self.media.resolve(value, part, self.cancel_token)
+        return asset.upload_path or value
+
+    # ----- Sending -----
+    def profile_dir(self, session_id):
+        # Session 1 keeps the regular profile; extra sessions each get a linked account of their own
+        base = f"./{self.browser_choice.lower()}_profile"
+        return base if session_id == 0 else f"{base}_{session_id + 1}"
+
+    def create_bot(self, session_id=0):
+        from whatsapp_client import WhatsAppBot, NAVIGATION_STAGES
+        bot_class = self.bot_class or WhatsAppBot
+        log = self.log
+        profile_dir = None
+        if self.sessions > 1:
+            profile_dir = self.profile_dir(session_id)
+            log = lambda msg: self.log(f"[S{session_id + 1}] {msg}")
+        bot = bot_class(self.browser_choice, self.wait_timeout, self.max_retries,
+                        self.persistent_session or profile_dir is not None,
+                        headless=self.headless, navigation=self.navigation,
+                        stage_timeouts=self.stage_timeouts, profile_dir=profile_dir,
+                        log=log, prompt=self.listener.prompt, base_url=self.base_url,
+                        cancel_token=self.cancel_token)
+        def on_stage(stage, seconds, ok):
+            self.metrics.observe(stage, bot.part or "Chat", seconds, ok)
+            # A navigation probe timing out just moves on to the next method; if every
+            # method fails, the part fails and pacing sees that instead
+            if self.pacing is not None and stage not in NAVIGATION_STAGES:
+                self.pacing.record_stage(ok)
+        bot.on_stage = on_stage
+        return bot
+
+    def row_parts(self, row):
+        # (part, value) for every part this row asks for, in sending order
+        parts = [("Text", cell_text(row, "Message"))]
+        parts += [(media_type, cell_text(row, media_type)) for media_type in MEDIA_COLUMNS]
+        return [(part, value) for part, value in parts if value]
+
+    def send_part(self, bot, index, number, part, value, caption=""):
+        # A media part with a caption also delivers the row's Text part
+        journal_parts = (part, "Text") if caption else (part,)
+        for journal_part in journal_parts:
+            self.journal.start_part(index, journal_part, number)
+        bot.part = part
+        if part != "Text":
+            value = self.upload_path(part, value)
+        start = time.monotonic()
+        if part == "Text":
+            success = bot.send_text(number, value)
+        else:
+            success = bot.send_media(number, value, part, caption=caption)
+        seconds = time.monotonic() - start
+        self.metrics.observe("total", part, seconds, success)
+        self.adapt_rate(part, success, seconds)
+        self.export_metrics()
+        status = "Sent" if success else "Failed"
+        for journal_part in journal_parts:
+            self.journal.finish_part(index, journal_part, status)
+            self.listener.on_status(index, journal_part, status)
+        return success
+
+    def drop_unsendable_media(self, index, number, parts):
+        # Media the registry found missing/oversized fails right away, without opening Attach
+        if self.assets is None:
+            return parts
+        usable = []
+        for part, value in parts:
+            asset = self.assets.get(part, value) if part != "Text" else None
+            if asset is not None and asset.problem:
+                self.log(f"{part} for {number} not sent: '{value}' {asset.problem}")
+                self.fail_parts(index, number, [(part, value)])
+            else:
+                usable.append((part, value))
+        return usable
+
+    def caption_for(self, parts):
+        # Text that can ride along as the first media part's caption, None to send it on its own
+        if not self.media_captions or len(parts) < 2 or parts[0][0] != "Text":
+            return None
+        from whatsapp_client import CAPTION_MAX_LENGTH
+        text = parts[0][1]
+        return text if len(text) <= CAPTION_MAX_LENGTH else None
+
+    def send_row(self, bot, index, row):
+        number = row["Number"]
+        done = self.sent_parts.get(index, set())
+        parts = []
+        for part, value in self.row_parts(row):
+            if part in done:
+                self.listener.on_status(index, part, "Sent")
+            else:
+                parts.append((part, value))
+        if not parts:
+            return True
+        usable = self.drop_unsendable_media(index, number, parts)
+        all_success = len(usable) == len(parts)
+        parts = usable
+        if not parts:
+            return False
+        # Text + media: one visit, the message becomes the first attachment's caption
+        caption = self.caption_for(parts)
+        to_send = parts[1:] if caption is not None else parts
+        if to_send[0][0] != "Text":
+            # No separate text to send: the chat is normally opened by send_text
+            bot.part = to_send[0][0]
+            if bot.open_chat(number) == "invalid":
+                bot.log(f"{number} is not a valid WhatsApp number")
+                self.fail_parts(index, number, parts)
+                return False
+        for position, (part, value) in enumerate(to_send):
+            success = self.send_part(bot, index, number, part, value,
+                                     caption=caption if position == 0 and caption is not None else "")
+            all_success = all_success and success
+            if part == "Text" and not success and bot.chat_number != number:
+                # Invalid number or unconfirmed chat: the media would land in another chat
+                self.fail_parts(index, number, to_send[position + 1:])
+                return False
+        return all_success
+
+    def fail_parts(self, index, number, parts):
+        for part, _ in parts:
+            self.journal.start_part(index, part, number)
+            self.journal.finish_part(index, part, "Failed")
+            self.listener.on_status(index, part, "Failed")
+
+    def process_row(self, session, index, row):
+        # Runs on a session's worker thread; raises Cancelled when stopped mid-row
+        self.cancel_token.wait_resumed()
+        session.bot.ensure_driver()
+        # Waits only for what is left of the interval since this account's last send
+        if not self.limiter.acquire(session.session_id):
+            return False
+        self.cancel_token.wait_resumed()
+
+        row_success = self.send_row(session.bot, index, row)
+        with self.counter_lock:
+            if row_success:
+                self.messages_sent += 1
+            else:
+                self.messages_failed += 1
+
+        self.listener.on_progress(self)
+        return row_success
+
+    def pending_rows(self, source):
+        for index, row in self.read_contacts(source):
+            done = self.sent_parts.get(index)
+            if done and all(part in done for part, _ in self.row_parts(row)):
+                for part in done:
+                    self.listener.on_status(index, part, "Sent")
+                continue
+            yield index, row
+
+    def adapt_rate(self, part, success, seconds):
+        if self.pacing is None:
+            return
+        change = self.pacing.record_part(part, success, seconds, self.limiter.per_minute)
+        if change is not None:
+            new_rate, reason = change
+            old_rate = self.limiter.per_minute
+            self.limiter.set_rate(new_rate)
+            self.metrics.set_gauge("rate_per_minute", new_rate, "Current per-account sending rate.")
+            self.log(f"Pacing: {old_rate:g} -> {new_rate:g} messages/minute per account ({reason})")
+
+    # ----- Metrics -----
+    def start_metrics(self):
+        self.metrics = StageMetrics()
+        self.metrics.set_gauge("rate_per_minute", self.limiter.per_minute, "Current per-account sending rate.")
+        self.metrics_written = 0
+        if self.metrics_port:
+            try:
+                self.metrics.serve(self.metrics_port)
+                self.log(f"Metrics: http://127.0.0.1:{self.metrics_port}/metrics")
+            except OSError as e:
+                self.log(f"Metrics endpoint not started on port {self.metrics_port}: {e}")
+
+    def export_metrics(self, force=False):
+        # The textfile is rewritten at most every METRICS_FILE_INTERVAL seconds while sending
+        if not self.metrics_file:
+            return
+        # Called from every worker thread: the interval check and the write go together
+        with self.metrics_lock:
+            now = time.monotonic()
+            if not force and now - self.metrics_written < METRICS_FILE_INTERVAL:
+                return
+            self.metrics_written = now
+            try:
+                self.metrics.write_textfile(self.metrics_file)
+            except OSError:
+                logging.exception("Could not write the metrics file.")
+
+    def log_metrics_summary(self):
+        lines = self.metrics.summary_lines()
+        if lines:
+            self.log("Stage latency summary:\n" + "\n".join(lines))
+
+    def pool_summary(self):
+        return self.pool.summary() if self.pool else ""
+
+    def run(self, file_path):
+        from session_pool import SessionPool
+
+        self.messages_sent = 0
+        self.messages_failed = 0
+        self.messages_skipped = 0
+        self.cancel_token = CancelToken()
+        self.limiter.reset()
+        self.log(f"Sending rate: {self.limiter.describe()}")
+
+        if self.schedule_time.strip():
+            self.wait_for_schedule(self.schedule_time.strip())
+            if self.stop_requested:
+                self.log("Stop requested by user. Halting process.")
+                self.listener.on_finished(self)
+                return True
+
+        source = self.open_contacts(file_path)
+        if source is None or not self.open_suppression():
+            return False
+        self.open_journal(file_path)
+        self.scan_contacts(file_path, source.columns)
+        self.start_media_prep()
+        self.start_metrics()
+        self.pool = SessionPool(self, self.sessions)
+        try:
+            self.pool.start()
+            self.start_time = time.time()
+            self.pool.run(self.pending_rows(source))
+        except Cancelled:
+            pass  # stopped during a login
+        finally:
+            self.pool.quit()
+            self.journal.close()
+            if self.media is not None:
+                self.media.shutdown()
+            if self.suppressed is not None:
+                self.suppressed.close()
+            self.export_metrics(force=True)
+            self.metrics.shutdown()
+        self.log_metrics_summary()
+        if self.stop_requested:
+            self.log("Stop requested by user. Halting process.")
+        self.log("Bulk messaging complete!")
+        self.listener.on_finished(self)
+        return True
+
+def run_messaging(file_path, default_code, delay_between, wait_timeout, schedule_time, browser_choice,
+                  max_retries, persistent_session, resume=False, sessions=1, listener=None):
+    engine = BulkSendEngine(default_code, delay_between, wait_timeout, browser_choice, max_retries,
+                            persistent_session, schedule_time=schedule_time, resume=resume,
+                            sessions=sessions, listener=listener)
+    engine.run(file_path)
+    return engine
+
+# ----------------------- Headless Entry Point -----------------------
+def main(argv=None):
+    import argparse
+    from bot_config import load_config
+    from log_setup import setup_logging_from_config
+
+    config_defaults = load_config()
+    parser = argparse.ArgumentParser(description="Send a bulk WhatsApp campaign without the GUI.")
+    parser.add_argument("file_path", help="Contact list (XLSX, CSV, TSV or Parquet)")
+    parser.add_argument("--country-code", default=config_defaults.get('default_country_code', '+20'))
+    parser.add_argument("--delay", type=float, default=float(config_defaults.get('delay_between', '2')),
+                        help="Minimum seconds between two messages of the same account")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Messages per minute per account, instead of --delay (0: unlimited)")
+    parser.add_argument("--burst", type=float, default=float(config_defaults.get('burst', '1')),
+                        help="Messages an account may send back to back before the rate applies")
+    parser.add_argument("--adaptive", action="store_true",
+                        default=config_defaults.get('adaptive_pacing', 'False') == 'True',
+                        help="Adjust the rate to the observed success rate and send times")
+    parser.add_argument("--min-rate", type=float, default=float(config_defaults.get('min_rate_per_minute', '2')),
+                        help="Lowest rate adaptive pacing may choose (messages/minute per account)")
+    parser.add_argument("--max-rate", type=float, default=float(config_defaults.get('max_rate_per_minute', '60')),
+                        help="Highest rate adaptive pacing may choose (messages/minute per account)")
+    parser.add_argument("--global-rate", type=float, default=float(config_defaults.get('global_rate_per_minute', '0')),
+                        help="Messages per minute over all sessions together (0: no cap)")
+    parser.add_argument("--timeout", type=float, default=float(config_defaults.get('wait_timeout', '20')))
+    parser.add_argument("--browser", default=config_defaults.get('browser', 'Chrome'))
+    parser.add_argument("--retries", type=int, default=int(config_defaults.get('max_retries', '2')))
+    parser.add_argument("--schedule", default="", help="Global start time (HH:MM[:SS] or an ISO date and time)")
+    parser.add_argument("--schedule-timezone", default=config_defaults.get('schedule_timezone', ''),
+                        help="Timezone for schedules without one: blank for local time, 'recipient' "
+                             "to infer it from each number's country code, or a name like Africa/Cairo")
+    parser.add_argument("--resume", action="store_true", help="Resume: only send the parts not yet delivered")
+    parser.add_argument("--headless", action="store_true", help="Run the browser without a window (needs a persistent session)")
+    parser.add_argument("--navigation", choices=("in_app", "url"), default=config_defaults.get('chat_navigation', 'in_app'),
+                        help="Switch chats inside the loaded app or reload the send URL per contact")
+    parser.add_argument("--separate-text", action="store_true",
+                        default=config_defaults.get('media_captions', 'True') != 'True',
+                        help="Send the message as its own bubble instead of as the media caption")
+    parser.add_argument("--no-preprocess", action="store_true",
+                        default=config_defaults.get('media_preprocessing', 'True') != 'True',
+                        help="Upload images and videos as they are instead of fitting them to WhatsApp's limits")
+    parser.add_argument("--media-cache", default=config_defaults.get('media_cache_dir', 'media_cache'),
+                        help="Directory for preprocessed media")
+    parser.add_argument("--suppression-list", default=config_defaults.get('suppression_list', ''),
+                        help="Opt-out list (one number per line, or CSV with the number first)")
+    parser.add_argument("--allow-duplicates", action="store_true",
+                        help="Message a number again when it appears in several rows")
+    parser.add_argument("--metrics-port", type=int, default=int(config_defaults.get('metrics_port', '0')),
+                        help="Serve per-stage latency histograms in Prometheus format on this port (0: off)")
+    parser.add_argument("--metrics-file", default=config_defaults.get('metrics_file', ''),
+                        help="Write the Prometheus metrics to this textfile while sending")
+    parser.add_argument("--sessions", type=int, default=int(config_defaults.get('sessions', '1')),
+                        help="Parallel browser sessions, each with its own profile and linked account")
+    args = parser.parse_args(argv)
+
+    setup_logging_from_config(config_defaults)
+    persistent_session = config_defaults.get('persistent_session', 'False') == 'True' or args.headless
+    engine = BulkSendEngine(args.country_code, args.delay, args.timeout, args.browser, args.retries,
+                            persistent_session, schedule_time=args.schedule, resume=args.resume,
+                            headless=args.headless, navigation=args.navigation, sessions=args.sessions,
+                            suppression_list=args.suppression_list, skip_duplicates=not args.allow_duplicates,
+                            metrics_port=args.metrics_port, metrics_file=args.metrics_file,
+                            schedule_timezone=args.schedule_timezone, rate_per_minute=args.rate,
+                            burst=args.burst, global_rate_per_minute=args.global_rate,
+                            adaptive_pacing=args.adaptive, min_rate_per_minute=args.min_rate,
+                            max_rate_per_minute=args.max_rate, media_captions=not args.separate_text,
+                            media_preprocessing=not args.no_preprocess, media_cache_dir=args.media_cache)
+    if not engine.run(args.file_path):
+        return 1
+    print(f"Total Contacts: {engine.total_contacts}\nMessages Sent: {engine.messages_sent}\nMessages Failed: {engine.messages_failed}\nSkipped: {engine.messages_skipped}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import threading
+import time
+
+# ----------------------- Send Journal -----------------------
+# Crash-safe record of every part (Text/Image/Video/File) sent to every contact.
+# SQLite in WAL mode: each update is a small append to the write-ahead log, and a
+# crash loses at most the part that was in flight. Resume redoes exactly the parts
+# that are not "Sent".
+
+JOURNAL_FILE = "send_journal.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parts (
+    campaign    TEXT NOT NULL,
+    row_index   INTEGER NOT NULL,
+    part        TEXT NOT NULL,
+    number      TEXT,
+    status      TEXT NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    started_at  REAL,
+    updated_at  REAL,
+    PRIMARY KEY (campaign, row_index, part)
+)
+"""
+
+def campaign_id(file_path):
+    return os.path.abspath(file_path)
+
+class SendJournal:
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        # Shared by all session threads, serialized by self.lock
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SCHEMA)
+        self.campaign = None
+
+    def begin(self, campaign, resume):
+        # Without resume the campaign starts over and its previous entries are dropped
+        with self.lock:
+            self.campaign = campaign
+            if not resume:
+                self.conn.execute("DELETE FROM parts WHERE campaign = ?", (campaign,))
+
+    def sent_parts(self):
+        # row_index -> set of parts already delivered in this campaign
+        done = {}
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT row_index, part FROM parts WHERE campaign = ? AND status = 'Sent'",
+                (self.campaign,))
+            for row_index, part in rows:
+                done.setdefault(row_index, set()).add(part)
+        return done
+
+    def start_part(self, row_index, part, number):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                """INSERT INTO parts (campaign, row_index, part, number, status, attempts, started_at, updated_at)
+                   VALUES (?, ?, ?, ?, 'Sending', 1, ?, ?)
+                   ON CONFLICT (campaign, row_index, part) DO UPDATE SET
+                       status = 'Sending', attempts = attempts + 1, number = excluded.number,
+                       updated_at = excluded.updated_at""",
+                (self.campaign, row_index, part, number, now, now))
+
+    def finish_part(self, row_index, part, status):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE parts SET status = ?, updated_at = ? WHERE campaign = ? AND row_index = ? AND part = ?",
+                (status, time.time(), self.campaign, row_index, part))
+
+    def counts(self):
+        with self.lock:
+            return dict(self.conn.execute(
+                "SELECT status, COUNT(*) FROM parts WHERE campaign = ? GROUP BY status", (self.campaign,)))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+
+# ----------------------- Stage Latency Metrics -----------------------
+# WhatsAppBot reports every wait (navigation, send button, attach, file input, preview,
+# confirm, upload, ...) through its on_stage callback; the engine adds the end-to-end
+# time of each part as stage "total". Durations land in fixed-bucket histograms keyed
+# by (stage, part), so recording is O(1) and memory does not grow with the campaign.
+# Percentiles are interpolated inside the bucket, which is plenty for tuning timeouts.
+# The same histograms are exposed in Prometheus text format, over HTTP and/or as a
+# textfile for node_exporter's textfile collector.
+
+# Upper bounds in seconds, roughly 1.5x apart from 10 ms to 10 min
+BUCKET_BOUNDS = (0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.35, 0.5, 0.75, 1, 1.5, 2, 3, 4, 6,
+                 8, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600)
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_PREFIX = "whatsapp_bot"
+
+class LatencyHistogram:
+    def __init__(self, bounds=BUCKET_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.failures = 0
+        self.max = 0.0
+
+    def observe(self, seconds, ok=True):
+        low, high = 0, len(self.bounds)
+        while low < high:
+            mid = (low + high) // 2
+            if seconds <= self.bounds[mid]:
+                high = mid
+            else:
+                low = mid + 1
+        self.counts[low] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if not ok:
+            self.failures += 1
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[bucket - 1] if bucket > 0 else 0.0
+                upper = self.bounds[bucket] if bucket < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+class StageMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # (stage, part) -> LatencyHistogram
+        self.gauges = {}      # name -> (value, help)
+        self.server = None
+
+    def observe(self, stage, part, seconds, ok=True):
+        with self.lock:
+            histogram = self.histograms.get((stage, part))
+            if histogram is None:
+                histogram = self.histograms[(stage, part)] = LatencyHistogram()
+            histogram.observe(seconds, ok)
+
+    def set_gauge(self, name, value, help_text=""):
+        with self.lock:
+            self.gauges[name] = (value, help_text)
+
+    def snapshot(self):
+        # (stage, part, count, failures, mean, p50, p95, p99, max), sorted by part then stage
+        with self.lock:
+            rows = []
+            for (stage, part), histogram in sorted(self.histograms.items(), key=lambda item: (item[0][1], item[0][0])):
+                rows.append((stage, part, histogram.count, histogram.failures, histogram.total / histogram.count,
+                             *(histogram.quantile(q) for q in QUANTILES), histogram.max))
+            return rows
+
+    def summary_lines(self):
+        rows = self.snapshot()
+        if not rows:
+            return []
+        lines = [f"{'Part':<6} {'Stage':<12} {'Count':>6} {'Fail':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'Max':>8}"]
+        for stage, part, count, failures, mean, p50, p95, p99, maximum in rows:
+            lines.append(f"{part:<6} {stage:<12} {count:>6} {failures:>5} {p50:>7.2f}s {p95:>7.2f}s {p99:>7.2f}s {maximum:>7.2f}s")
+        return lines
+
+    def prometheus_text(self):
+        name = f"{METRIC_PREFIX}_stage_seconds"
+        lines = [f"# HELP {name} Duration of each WhatsApp Web interaction stage.",
+                 f"# TYPE {name} histogram"]
+        failures = []
+        with self.lock:
+            for (stage, part), histogram in sorted(self.histograms.items()):
+                labels = f'stage="{stage}",part="{part}"'
+                cumulative = 0
+                for bound, count in zip(self.bounds_with_inf(histogram), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+                failures.append(f"{METRIC_PREFIX}_stage_failures_total{{{labels}}} {histogram.failures}")
+            gauges = sorted(self.gauges.items())
+        lines += [f"# HELP {METRIC_PREFIX}_stage_failures_total Stage waits that timed out or failed.",
+                  f"# TYPE {METRIC_PREFIX}_stage_failures_total counter"] + failures
+        for gauge, (value, help_text) in gauges:
+            lines += [f"# HELP {METRIC_PREFIX}_{gauge} {help_text}", f"# TYPE {METRIC_PREFIX}_{gauge} gauge",
+                      f"{METRIC_PREFIX}_{gauge} {value:g}"]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def bounds_with_inf(histogram):
+        return [f"{bound:g}" for bound in histogram.bounds] + ["+Inf"]
+
+    def write_textfile(self, path):
+        # Written to a temp file and renamed so a scraper never reads half a file
+        tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        # Prometheus endpoint at http://host:port/metrics on a daemon thread
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logging.debug("Metrics request: " + format % args)
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True, name="metrics-http").start()
+        return self.server
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
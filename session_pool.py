@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+
+from cancellation import Cancelled
+from row_scheduler import RowSpool, ScheduledWorkQueue
+
+# ----------------------- Session Pool -----------------------
+# N browser sessions, each with its own profile directory (and therefore its own
+# linked WhatsApp account), pulling rows from one shared work queue: unscheduled rows
+# flow through a bounded FIFO, rows with a future Schedule time wait in a heap until due.
+# The engine decides what happens to a row; the pool only owns browsers, threads and counters.
+#
+# Memory stays bounded with scheduled rows too: while reading the sheet, a row due later
+# than the release horizon is spooled to disk (row_scheduler.RowSpool). A release thread
+# walks the engine's ReleasePlan in time order, and as rows come within
+# SCHEDULED_LOOKAHEAD seconds, takes up to SCHEDULED_WAVE_ROWS of them back out of the
+# spool and parks them in the heap until due.
+
+SCHEDULED_LOOKAHEAD = 60
+SCHEDULED_WAVE_ROWS = 2000
+
+class Session:
+    def __init__(self, session_id, bot):
+        self.session_id = session_id
+        self.bot = bot
+        self.sent = 0
+        self.failed = 0
+        self.state = "Idle"
+
+    @property
+    def name(self):
+        return f"S{self.session_id + 1}"
+
+    def summary(self):
+        return f"{self.name}: {self.state} ({self.sent} sent / {self.failed} failed)"
+
+class SessionPool:
+    def __init__(self, engine, size):
+        self.engine = engine
+        self.size = max(1, int(size))
+        self.sessions = []
+        # A few rows per session in flight; the producer blocks once the workers fall behind
+        self.work = ScheduledWorkQueue(maxsize=self.size * 4, max_scheduled=SCHEDULED_WAVE_ROWS)
+        # Rows deferred to the release thread, by index; guarded by defer_lock together
+        # with released_until, the release time up to which that thread has taken rows
+        self.defer_lock = threading.Lock()
+        self.deferred = None
+        self.released_until = float("-inf")
+
+    def start(self):
+        # Logins are done one after the other so the QR prompts don't overlap
+        for session_id in range(self.size):
+            bot = self.engine.create_bot(session_id)
+            session = Session(session_id, bot)
+            self.sessions.append(session)
+            session.state = "Logging in"
+            self.engine.listener.on_progress(self.engine)
+            bot.open_whatsapp()
+            session.state = "Ready"
+        self.engine.listener.on_progress(self.engine)
+
+    def run(self, rows):
+        threads = [threading.Thread(target=self.worker, args=(session,), daemon=True,
+                                    name=f"whatsapp-{session.name}")
+                   for session in self.sessions]
+        for thread in threads:
+            thread.start()
+        # Stop and the last worker exiting both cancel the queue, which also wakes the releaser
+        unregister = self.engine.cancel_token.on_cancel(self.work.cancel)
+        releaser = threading.Thread(target=self.release_scheduled, daemon=True, name="scheduled-release")
+        releaser.start()
+        try:
+            for index, row in rows:
+                if self.engine.stop_requested or self.work.cancelled:
+                    break
+                release_at = self.engine.release_time(index, row)
+                if release_at is not None and self.defer(index, row, release_at):
+                    continue
+                self.put((index, row), release_at)
+        finally:
+            # Scheduled rows keep the campaign open until the last one was handed out
+            releaser.join()
+            unregister()
+            if self.deferred is not None:
+                self.deferred.close()
+            self.work.close()
+            for thread in threads:
+                thread.join()
+
+    def defer(self, index, row, release_at):
+        # True if the row was spooled for the release thread, False if it is due soon
+        # enough (or the release thread already went past its time) to be queued now
+        with self.defer_lock:
+            if release_at <= self.released_until:
+                return False
+            if self.deferred is None:
+                self.deferred = RowSpool()
+            self.deferred.put(index, row)
+            return True
+
+    def release_scheduled(self):
+        plan = self.engine.plan
+        try:
+            position = 0
+            while plan is not None and position < len(plan):
+                # Sleep until the next planned row is within the lookahead
+                if self.work.wait_cancelled(plan.times[position] - SCHEDULED_LOOKAHEAD - time.time()):
+                    return
+                with self.defer_lock:
+                    horizon = time.time() + SCHEDULED_LOOKAHEAD
+                    start = position
+                    while (position < len(plan) and plan.times[position] <= horizon
+                           and position - start < SCHEDULED_WAVE_ROWS):
+                        self.released_until = plan.times[position]
+                        position += 1
+                    wave = self.deferred.take(plan.indices[start:position]) if self.deferred else []
+                for index, row in wave:
+                    if self.engine.stop_requested:
+                        return
+                    self.put((index, row), self.engine.release_time(index, row))
+        except Exception:
+            logging.exception("Error releasing scheduled rows.")
+        finally:
+            with self.defer_lock:
+                self.released_until = float("inf")
+
+    def put(self, item, release_at=None):
+        # Blocks while the queue is full; the last worker to exit cancels the queue, so
+        # the producer is never left waiting on workers that are gone
+        self.work.put(item, release_at)
+
+    def cancel(self):
+        # Stop: drop queued and scheduled rows and wake every idle worker
+        self.work.cancel()
+
+    def worker(self, session):
+        try:
+            while True:
+                item = self.work.get()
+                if item is None:
+                    break
+                if self.engine.stop_requested:
+                    break
+                index, row = item
+                session.state = "Sending"
+                row_success = self.engine.process_row(session, index, row)
+                if row_success:
+                    session.sent += 1
+                else:
+                    session.failed += 1
+                session.state = "Ready"
+        except Cancelled:
+            pass
+        except Exception:
+            logging.exception(f"Session {session.name} crashed.")
+        finally:
+            session.state = "Stopped"
+            if all(other.state == "Stopped" for other in self.sessions):
+                self.work.cancel()
+            self.engine.listener.on_progress(self.engine)
+
+    def summary(self):
+        text = " | ".join(session.summary() for session in self.sessions)
+        scheduled = self.work.scheduled_count() + (len(self.deferred) if self.deferred else 0)
+        return f"{text} | {scheduled} scheduled" if scheduled else text
+
+    def quit(self):
+        for session in self.sessions:
+            session.bot.quit_driver()
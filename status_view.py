@@ -0,0 +1,206 @@
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+# ----------------------- Contact Status Store -----------------------
+# One byte per part per contact instead of one Tk item per row. The engine thread
+# writes into the store; the table below only materializes the rows on screen.
+
+STATUS_NAMES = ["", "Pending", "Sending", "Sent", "Failed", "Invalid", "Suppressed", "Duplicate"]
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+# Order used when sorting by a status column: problems first
+STATUS_SORT_RANK = bytes([7, 5, 4, 6, 0, 1, 2, 3])  # indexed by status code
+PART_COLUMNS = ("Text", "Image", "Video", "File")
+PENDING = STATUS_CODES["Pending"]
+
+class StatusStore:
+    def __init__(self, part_columns=PART_COLUMNS):
+        self.part_columns = part_columns
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.numbers = []
+            self.schedules = []
+            self.codes = {column: bytearray() for column in self.part_columns}
+            self.version = 0
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def append(self, contacts):
+        # contacts: (index, number, schedule) with contiguous indices, as the engine emits them
+        with self.lock:
+            for index, number, schedule in contacts:
+                if index != len(self.numbers):
+                    raise ValueError(f"Contact index {index} out of sequence")
+                self.numbers.append(number)
+                self.schedules.append(schedule or "")
+            for codes in self.codes.values():
+                codes.extend(bytes([PENDING]) * (len(self.numbers) - len(codes)))
+            self.version += 1
+
+    def set(self, index, column, value):
+        if column not in self.codes:
+            return
+        code = STATUS_CODES.get(value)
+        if code is None:
+            STATUS_NAMES.append(value)
+            code = STATUS_CODES[value] = len(STATUS_NAMES) - 1
+        with self.lock:
+            self.codes[column][index] = code
+            self.version += 1
+
+    def row_values(self, index):
+        statuses = [STATUS_NAMES[self.codes[column][index]] for column in self.part_columns]
+        return (self.numbers[index], *statuses, self.schedules[index])
+
+    def find_status(self, status, start=0):
+        # First row at or after `start` with `status` in any part column, None if there is none
+        code = STATUS_CODES.get(status)
+        if code is None:
+            return None
+        needle = bytes([code])
+        hits = [codes.find(needle, start) for codes in self.codes.values()]
+        hits = [hit for hit in hits if hit >= 0]
+        return min(hits) if hits else None
+
+    def count(self, status):
+        code = STATUS_CODES.get(status)
+        if code is None:
+            return 0
+        return sum(codes.count(bytes([code])) for codes in self.codes.values())
+
+    def sort_order(self, column, reverse=False):
+        # Row order for a column; status columns use a counting-sort friendly numpy argsort
+        import numpy as np
+        if column in self.codes:
+            codes = np.frombuffer(bytes(self.codes[column]), dtype=np.uint8)
+            keys = np.frombuffer(STATUS_SORT_RANK, dtype=np.uint8)[np.minimum(codes, len(STATUS_SORT_RANK) - 1)]
+        else:
+            values = self.numbers if column == "Number" else self.schedules
+            keys = np.array(values, dtype=object)
+        order = np.argsort(keys, kind="stable")
+        return order[::-1] if reverse else order
+
+# ----------------------- Virtualized Status Table -----------------------
+class StatusTable(ttk.Frame):
+    # A Treeview with a fixed pool of items (one per visible line) that are re-filled
+    # from the store as the user scrolls. Cost is independent of the number of contacts.
+    # With refresh_ms=None the owner calls refresh() itself (e.g. once per GUI frame).
+    def __init__(self, master, store, columns, refresh_ms=200, **kwargs):
+        super().__init__(master, **kwargs)
+        self.store = store
+        self.columns = columns
+        self.refresh_ms = refresh_ms
+        self.offset = 0
+        self.order = None  # numpy array of row indices when sorted, None for file order
+        self.sort_column = None
+        self.sort_reverse = False
+        self.rendered_version = None
+        self.visible_rows = 8
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=self.visible_rows,
+                                 selectmode="browse")
+        for col in columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-1, "pages"))
+        self.tree.bind("<Next>", lambda e: self.scroll(1, "pages"))
+        if self.refresh_ms:
+            self.after(self.refresh_ms, self.poll)
+
+    # ----- Geometry / scrolling -----
+    def on_resize(self, event):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # The heading takes roughly one row
+        rows = max(1, event.height // row_height - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+
+    def max_offset(self):
+        return max(0, len(self.store) - self.visible_rows)
+
+    def scroll_to(self, offset):
+        self.offset = min(max(0, int(offset)), self.max_offset())
+        self.render()
+
+    def scroll(self, amount, what):
+        step = self.visible_rows if what == "pages" else 1
+        self.scroll_to(self.offset + amount * step)
+
+    def on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.scroll_to(float(args[0]) * len(self.store))
+        elif action == "scroll":
+            self.scroll(int(args[0]), args[1])
+
+    # ----- Rendering -----
+    def row_at(self, position):
+        return int(self.order[position]) if self.order is not None else position
+
+    def render(self):
+        total = len(self.store)
+        if self.order is not None and len(self.order) != total:
+            # New rows arrived while sorted: re-sort so they are included
+            self.order = self.store.sort_order(self.sort_column, self.sort_reverse)
+        self.offset = min(self.offset, self.max_offset())
+        count = min(self.visible_rows, total - self.offset)
+        items = self.tree.get_children()
+        for item in items[count:]:
+            self.tree.delete(item)
+        for i in range(count):
+            values = self.store.row_values(self.row_at(self.offset + i))
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert("", tk.END, values=values)
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + count) / total)
+        else:
+            self.scrollbar.set(0, 1)
+        self.rendered_version = self.store.version
+
+    def refresh(self):
+        if self.store.version != self.rendered_version:
+            self.render()
+
+    def poll(self):
+        self.refresh()
+        self.after(self.refresh_ms, self.poll)
+
+    def reset(self):
+        self.offset = 0
+        self.order = None
+        self.sort_column = None
+        self.render()
+
+    # ----- Sorting / navigation -----
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = column, False
+        self.order = self.store.sort_order(column, self.sort_reverse) if len(self.store) else None
+        self.scroll_to(0)
+
+    def jump_to_next(self, status="Failed"):
+        # Next row with `status` after the first visible one, wrapping around; file order only
+        if self.order is not None:
+            self.order = None
+            self.sort_column = None
+        row = self.store.find_status(status, self.offset + 1)
+        if row is None:
+            row = self.store.find_status(status, 0)
+        if row is not None:
+            self.scroll_to(row)
+        return row
@@ -0,0 +1,123 @@
+import hashlib
+import mmap
+import os
+import struct
+
+# ----------------------- Suppression Index -----------------------
+# Opted-out numbers are normalized once and stored as 64-bit hashes in an on-disk
+# open-addressing hash table (<list>.<code>.idx next to the list). Lookups mmap the file
+# and probe a couple of slots, so membership checks are O(1) and cost no load time,
+# even for lists with millions of entries. The index is rebuilt when the list changes
+# and kept per default country code, since that decides how local numbers normalize.
+
+MAGIC = b"WASUPP01"
+HEADER = struct.Struct("<8sQQd")  # magic, capacity, count, source mtime
+SLOT = struct.Struct("<Q")
+LOAD_FACTOR = 0.5
+BUILD_CHUNK = 10000
+
+def number_hash(number):
+    value = int.from_bytes(hashlib.blake2b(number.encode(), digest_size=8).digest(), "little")
+    return value or 1  # 0 marks an empty slot
+
+def read_numbers(path):
+    # One number per line, or the first column of a CSV; a header line is skipped by validation
+    with open(path, encoding="utf-8-sig", errors="ignore") as f:
+        for line in f:
+            value = line.split(",")[0].split("\t")[0].strip().strip('"')
+            if value:
+                yield value
+
+class SuppressionIndex:
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self._file = open(index_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.capacity, self.count, self.source_mtime = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{index_path} is not a suppression index")
+        self._mask = self.capacity - 1
+
+    def __contains__(self, number):
+        target = number_hash(number)
+        slot = target & self._mask
+        while True:
+            value = SLOT.unpack_from(self._map, HEADER.size + slot * SLOT.size)[0]
+            if value == 0:
+                return False
+            if value == target:
+                return True
+            slot = (slot + 1) & self._mask
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    @classmethod
+    def build(cls, list_path, default_code, index_path=None):
+        from phone_numbers import normalize_numbers
+        index_path = index_path or index_path_for(list_path, default_code)
+        hashes = set()
+        batch = []
+        for value in read_numbers(list_path):
+            batch.append(value)
+            if len(batch) >= BUILD_CHUNK:
+                hashes.update(cls._valid_hashes(normalize_numbers(batch, default_code)))
+                batch = []
+        if batch:
+            hashes.update(cls._valid_hashes(normalize_numbers(batch, default_code)))
+
+        capacity = 1
+        while capacity * LOAD_FACTOR < max(len(hashes), 1):
+            capacity *= 2
+        table = bytearray(capacity * SLOT.size)
+        mask = capacity - 1
+        for value in hashes:
+            slot = value & mask
+            while SLOT.unpack_from(table, slot * SLOT.size)[0]:
+                slot = (slot + 1) & mask
+            SLOT.pack_into(table, slot * SLOT.size, value)
+
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, capacity, len(hashes), os.path.getmtime(list_path)))
+            f.write(table)
+        os.replace(tmp_path, index_path)
+        return cls(index_path)
+
+    @staticmethod
+    def _valid_hashes(normalized):
+        numbers, errors = normalized
+        return (number_hash(number) for number, error in zip(numbers, errors) if not error)
+
+def index_path_for(list_path, default_code):
+    return f"{list_path}.{''.join(ch for ch in str(default_code) if ch.isdigit())}.idx"
+
+def open_suppression_index(list_path, default_code):
+    # Reuse the index while it matches the list's mtime, otherwise rebuild it
+    index_path = index_path_for(list_path, default_code)
+    if os.path.exists(index_path):
+        try:
+            index = SuppressionIndex(index_path)
+            if index.source_mtime == os.path.getmtime(list_path):
+                return index
+            index.close()
+        except (OSError, ValueError, struct.error):
+            pass
+    return SuppressionIndex.build(list_path, default_code, index_path)
+
+class DuplicateFilter:
+    # Per-campaign set of recipient hashes; the first row for a number wins
+    def __init__(self):
+        self.seen = set()
+
+    def check_and_add(self, number):
+        value = number_hash(number)
+        if value in self.seen:
+            return True
+        self.seen.add(value)
+        return False
@@ -1,624 +1,564 @@
-import threading
-import time
-import urllib.parse
-import pandas as pd
-import tkinter as tk
-from tkinter import messagebox, filedialog, ttk
-import logging
-import configparser
-import os
-import queue
-from datetime import datetime, timedelta
-import sys
-import unittest
-
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import WebDriverException  # For driver check
-
-# --- Driver management imports ---
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-
-# ----------------------- Configuration Persistence -----------------------
-CONFIG_FILE = "config.ini"
-
-def load_config():
-    config = configparser.ConfigParser()
-    if os.path.exists(CONFIG_FILE):
-        config.read(CONFIG_FILE)
-    else:
-        # Added persistent_session option
-        config['DEFAULT'] = {
-            'default_country_code': '+20',
-            'delay_between': '2',
-            'wait_timeout': '20',
-            'browser': 'Chrome',
-            'max_retries': '2',
-            'persistent_session': 'False'
-        }
-        with open(CONFIG_FILE, 'w') as configfile:
-            config.write(configfile)
-    return config['DEFAULT']
-
-def save_config(new_config):
-    config = configparser.ConfigParser()
-    config['DEFAULT'] = new_config
-    with open(CONFIG_FILE, 'w') as configfile:
-        config.write(configfile)
-
-# ----------------------- Global Variables -----------------------
-config_defaults = load_config()
-
-messages_sent = 0
-messages_failed = 0
-counter_lock = threading.Lock()
-stop_requested = False
-pause_event = threading.Event()
-pause_event.set()  # Not paused initially
-log_queue = queue.Queue()
-
-# For tracking messaging progress (for estimated time remaining)
-messaging_start_time = None
-
-# ----------------------- Logging Setup -----------------------
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s %(levelname)s: %(message)s",
-    handlers=[
-        logging.FileHandler("whatsapp_bot.log"),
-        logging.StreamHandler()
-    ]
-)
-
-# ----------------------- Helper Functions -----------------------
-def update_labels(total):
-    with counter_lock:
-        sent_label.config(text=f"Messages Sent: {messages_sent}/{total}")
-        failed_label.config(text=f"Messages Failed: {messages_failed}/{total}")
-        progress_label.config(text=f"Processed: {messages_sent + messages_failed}/{total}")
-        progress_value = int(100 * (messages_sent + messages_failed) / total) if total > 0 else 0
-        progress_bar['value'] = progress_value
-
-        # Update estimated time remaining if messaging has started
-        if messaging_start_time:
-            elapsed = time.time() - messaging_start_time
-            processed = messages_sent + messages_failed
-            if processed > 0:
-                avg_time = elapsed / processed
-                remaining = (total - processed) * avg_time
-                estimated_time_label.config(text=f"Estimated Time Remaining: {int(remaining)} sec")
-            else:
-                estimated_time_label.config(text="Estimated Time Remaining: -- sec")
-
-def process_log_queue():
-    while not log_queue.empty():
-        msg = log_queue.get()
-        log_text.insert(tk.END, msg + "\n")
-        log_text.see(tk.END)
-    root.after(100, process_log_queue)
-
-def log_message(msg):
-    log_queue.put(msg)
-    logging.info(msg)
-
-def format_phone_number(num, default_code):
-    num_str = str(num).strip()
-    if not num_str.startswith('+'):
-        if num_str.startswith('0'):
-            num_str = num_str[1:]
-        num_str = default_code + num_str
-    return num_str
-
-def wait_for_schedule(schedule_str):
-    try:
-        now = datetime.now()
-        scheduled_time = datetime.strptime(schedule_str, "%H:%M:%S").replace(
-            year=now.year, month=now.month, day=now.day)
-        if scheduled_time < now:
-            scheduled_time += timedelta(days=1)
-        delay = (scheduled_time - now).total_seconds()
-        log_message(f"Global schedule: waiting until {scheduled_time.strftime('%H:%M:%S')} (in {int(delay)} seconds)")
-        time.sleep(delay)
-    except Exception as e:
-        logging.exception("Error parsing global scheduled time. Continuing immediately.")
-
-def wait_until_row(schedule_str):
-    try:
-        if pd.isna(schedule_str) or str(schedule_str).strip() == "":
-            return
-        now = datetime.now()
-        scheduled_time = datetime.strptime(schedule_str, "%H:%M:%S").replace(
-            year=now.year, month=now.month, day=now.day)
-        if scheduled_time < now:
-            scheduled_time += timedelta(days=1)
-        delay = (scheduled_time - now).total_seconds()
-        log_message(f"Row schedule: waiting until {scheduled_time.strftime('%H:%M:%S')} (in {int(delay)} seconds)")
-        while delay > 0:
-            if stop_requested:
-                break
-            pause_event.wait()
-            sleep_interval = min(0.5, delay)
-            time.sleep(sleep_interval)
-            delay -= sleep_interval
-    except Exception as e:
-        logging.exception("Error parsing row schedule. Continuing immediately.")
-
-# ----------------------- WhatsAppBot Class (Modular & Enhanced) -----------------------
-class WhatsAppBot:
-    def __init__(self, browser_choice, wait_timeout, max_retries, persistent_session=False):
-        self.browser_choice = browser_choice
-        self.wait_timeout = wait_timeout
-        self.max_retries = max_retries
-        self.persistent_session = persistent_session
-        self.driver = None
-        self.init_driver()
-
-    def init_driver(self):
-        if self.browser_choice == "Chrome":
-            from selenium.webdriver.chrome.options import Options
-            options = Options()
-            if self.persistent_session:
-                options.add_argument("--user-data-dir=./chrome_profile")
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(options=options, service=service)
-        elif self.browser_choice == "Firefox":
-            from selenium.webdriver.firefox.options import Options as FirefoxOptions
-            options = FirefoxOptions()
-            if self.persistent_session:
-                profile_path = "./firefox_profile"
-                if not os.path.exists(profile_path):
-                    os.makedirs(profile_path)
-                options.profile = webdriver.FirefoxProfile(profile_path)
-            service = Service(GeckoDriverManager().install())
-            self.driver = webdriver.Firefox(options=options, service=service)
-        else:
-            raise ValueError(f"Unsupported browser: {self.browser_choice}")
-        self.driver.implicitly_wait(self.wait_timeout)
-
-    def is_driver_valid(self):
-        if self.driver is None:
-            return False
-        try:
-            _ = self.driver.title
-            return True
-        except WebDriverException:
-            return False
-
-    def ensure_driver(self):
-        if not self.is_driver_valid():
-            try:
-                if self.driver:
-                    self.driver.quit()
-            except Exception:
-                pass
-            self.init_driver()
-            self.driver.get("https://web.whatsapp.com")
-            messagebox.showinfo("WhatsApp Login", "The browser was closed. A new browser has been opened.\nPlease scan the QR code again.")
-        return self.driver
-
-    def open_whatsapp(self):
-        self.driver.get("https://web.whatsapp.com")
-        messagebox.showinfo("WhatsApp Login", "Please scan the QR code in the opened browser, then click OK to continue.")
-
-    def quit_driver(self):
-        try:
-            self.driver.quit()
-        except Exception:
-            pass
-
-    def send_text(self, wait, number, message):
-        encoded_message = urllib.parse.quote(message)
-        url = f"https://web.whatsapp.com/send?phone={number}&text={encoded_message}"
-        self.driver.get(url)
-        time.sleep(2)
-        success = False
-        delay = 1
-        for attempt in range(self.max_retries):
-            try:
-                send_button = wait.until(EC.element_to_be_clickable((By.XPATH, '//span[@data-icon="send"]')))
-                send_button.click()
-                log_message(f"Text message sent to {number}")
-                success = True
-                break
-            except Exception as e:
-                log_message(f"Text attempt {attempt+1} failed for {number}")
-                time.sleep(delay)
-                delay *= 2
-        return success
-
-    def send_media(self, wait, number, file_path, media_type):
-        log_message(f"Sending {media_type} '{file_path}' to {number}")
-        success = False
-        delay = 1
-        for attempt in range(self.max_retries):
-            try:
-                attach_button = wait.until(EC.presence_of_element_located((By.XPATH, '//button[@title="Attach"]')))
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", attach_button)
-                clickable_attach = wait.until(EC.element_to_be_clickable((By.XPATH, '//button[@title="Attach"]')))
-                clickable_attach.click()
-                time.sleep(1)
-                file_input = self.driver.find_element(By.XPATH, '//input[@type="file"]')
-                file_input.send_keys(os.path.abspath(file_path))
-                time.sleep(1)
-                send_button = wait.until(EC.element_to_be_clickable((By.XPATH, '//span[@data-icon="send"]')))
-                time.sleep(2)
-                send_button.click()
-                time.sleep(5)
-                log_message(f"{media_type} sent to {number}")
-                success = True
-                break
-            except Exception as e:
-                log_message(f"{media_type} attempt {attempt+1} failed for {number}")
-                time.sleep(delay)
-                delay *= 2
-        return success
-
-# ----------------------- Main Messaging Function -----------------------
-def run_messaging(file_path, default_code, delay_between, wait_timeout, schedule_time, browser_choice, max_retries, persistent_session):
-    global messages_sent, messages_failed, stop_requested, messaging_start_time
-    messages_sent = 0
-    messages_failed = 0
-    stop_requested = False
-
-    if schedule_time.strip():
-        wait_for_schedule(schedule_time.strip())
-
-    try:
-        df = pd.read_excel(file_path)
-        required_cols = ['Number', 'Message']
-        if not all(col in df.columns for col in required_cols):
-            messagebox.showerror("Error", f"Excel file must contain at least {required_cols} columns")
-            return
-    except Exception as e:
-        messagebox.showerror("Error", f"Error reading Excel file")
-        logging.exception("Error reading Excel file.")
-        return
-
-    df['Number'] = df['Number'].apply(lambda num: format_phone_number(num, default_code))
-    total_contacts = len(df)
-
-    # Populate Treeview with initial status
-    for item in tree.get_children():
-        tree.delete(item)
-    tree["columns"] = ("Number", "Text", "Image", "Video", "File", "Schedule")
-    for col in tree["columns"]:
-        tree.heading(col, text=col)
-    for idx, row in df.iterrows():
-        schedule_val = row.get("Schedule", "")
-        tree.insert("", tk.END, iid=idx, values=(row["Number"], "Pending", "Pending", "Pending", "Pending", schedule_val))
-
-    bot = WhatsAppBot(browser_choice, wait_timeout, max_retries, persistent_session)
-    bot.open_whatsapp()
-    wait = WebDriverWait(bot.driver, wait_timeout)
-
-    messaging_start_time = time.time()
-
-    start_index = 0
-    progress_file = "progress.txt"
-    if resume_var.get() and os.path.exists(progress_file):
-        try:
-            with open(progress_file, "r") as pf:
-                start_index = int(pf.read().strip())
-            log_message(f"Resuming from contact index {start_index}")
-        except Exception as e:
-            log_message("Error reading progress file. Starting from beginning.")
-            start_index = 0
-
-    for index, row in df.iterrows():
-        if index < start_index:
-            continue
-        if stop_requested:
-            log_message("Stop requested by user. Halting process.")
-            break
-
-        bot.ensure_driver()
-        wait = WebDriverWait(bot.driver, wait_timeout)
-
-        if "Schedule" in row and pd.notna(row["Schedule"]) and str(row["Schedule"]).strip() != "":
-            wait_until_row(str(row["Schedule"]).strip())
-
-        number = row["Number"]
-        text_success = True
-        if pd.notna(row["Message"]) and str(row["Message"]).strip() != "":
-            text_success = bot.send_text(wait, number, str(row["Message"]).strip())
-            tree.set(index, column="Text", value="Sent" if text_success else "Failed")
-        image_success = True
-        if "Image" in row and pd.notna(row["Image"]) and str(row["Image"]).strip() != "":
-            image_success = bot.send_media(wait, number, str(row["Image"]).strip(), "Image")
-            tree.set(index, column="Image", value="Sent" if image_success else "Failed")
-        video_success = True
-        if "Video" in row and pd.notna(row["Video"]) and str(row["Video"]).strip() != "":
-            video_success = bot.send_media(wait, number, str(row["Video"]).strip(), "Video")
-            tree.set(index, column="Video", value="Sent" if video_success else "Failed")
-        file_success = True
-        if "File" in row and pd.notna(row["File"]) and str(row["File"]).strip() != "":
-            file_success = bot.send_media(wait, number, str(row["File"]).strip(), "File")
-            tree.set(index, column="File", value="Sent" if file_success else "Failed")
-
-        with counter_lock:
-            if text_success and image_success and video_success and file_success:
-                messages_sent += 1
-            else:
-                messages_failed += 1
-
-        with open(progress_file, "w") as pf:
-            pf.write(str(index + 1))
-        root.after(0, update_labels, total_contacts)
-        
-        # Use short sleep intervals to check for stop flag frequently
-        sleep_time = 0
-        while sleep_time < delay_between:
-            if stop_requested:
-                break
-            time.sleep(0.5)
-            sleep_time += 0.5
-
-    bot.quit_driver()
-    log_message("Bulk messaging complete!")
-    messagebox.showinfo("Summary", f"Total Contacts: {total_contacts}\nMessages Sent: {messages_sent}\nMessages Failed: {messages_failed}")
-    root.after(0, lambda: start_button.config(state=tk.NORMAL))
-
-# ----------------------- Advanced Settings Dialog -----------------------
-def open_settings():
-    settings_win = tk.Toplevel(root)
-    settings_win.title("Advanced Settings")
-    settings_win.geometry("300x150")
-    settings_win.configure(bg="#f0f2f5")
-
-    persistent_var = tk.BooleanVar()
-    persistent_var.set(config_defaults.get('persistent_session', 'False') == 'True')
-
-    tk.Label(settings_win, text="Persistent Session:", bg="#f0f2f5", font=("Helvetica", 11)).pack(pady=10)
-    tk.Checkbutton(settings_win, text="Keep session (avoid re-scan QR code)", variable=persistent_var, bg="#f0f2f5", font=("Helvetica", 10)).pack()
-
-    def save_settings():
-        config_defaults['persistent_session'] = str(persistent_var.get())
-        save_config(config_defaults)
-        messagebox.showinfo("Settings Saved", "Advanced settings have been updated.")
-        settings_win.destroy()
-
-    tk.Button(settings_win, text="Save", command=save_settings, font=("Helvetica", 11)).pack(pady=10)
-
-# ----------------------- GUI Functions -----------------------
-def start_thread():
-    file_path = filedialog.askopenfilename(title="Select Excel File",
-                                           filetypes=(("Excel files", "*.xlsx"), ("All files", "*.*")))
-    if not file_path:
-        return
-    default_code = country_code_entry.get().strip()
-    if not default_code.startswith('+'):
-        default_code = '+' + default_code
-    try:
-        delay_between = float(delay_entry.get().strip())
-    except:
-        delay_between = 2.0
-    try:
-        wait_timeout = float(timeout_entry.get().strip())
-    except:
-        wait_timeout = 20.0
-    schedule_time = schedule_entry.get().strip()
-    browser_choice = browser_var.get()
-    try:
-        max_retries = int(retry_entry.get().strip())
-    except:
-        max_retries = 2
-    persistent_session = config_defaults.get('persistent_session', 'False') == 'True'
-
-    new_config = {
-        'default_country_code': default_code,
-        'delay_between': str(delay_between),
-        'wait_timeout': str(wait_timeout),
-        'browser': browser_choice,
-        'max_retries': str(max_retries),
-        'persistent_session': str(persistent_session)
-    }
-    save_config(new_config)
-
-    start_button.config(state=tk.DISABLED)
-    threading.Thread(
-        target=run_messaging,
-        args=(file_path, default_code, delay_between, wait_timeout, schedule_time, browser_choice, max_retries, persistent_session),
-        daemon=True
-    ).start()
-
-def toggle_pause():
-    if pause_event.is_set():
-        pause_event.clear()
-        pause_button.config(text="Resume Messaging")
-        log_message("Messaging paused.")
-    else:
-        pause_event.set()
-        pause_button.config(text="Pause Messaging")
-        log_message("Messaging resumed.")
-
-def request_stop():
-    global stop_requested
-    stop_requested = True
-    log_message("Stop button clicked. Requesting stop...")
-    start_button.config(state=tk.NORMAL)
-
-# ----------------------- Splash Screen Function -----------------------
-def show_splash_screen():
-    splash = tk.Toplevel()
-    splash.overrideredirect(True)
-    splash_width = 400
-    splash_height = 200
-    screen_width = root.winfo_screenwidth()
-    screen_height = root.winfo_screenheight()
-    x = int((screen_width/2) - (splash_width/2))
-    y = int((screen_height/2) - (splash_height/2))
-    splash.geometry(f"{splash_width}x{splash_height}+{x}+{y}")
-
-    # Optionally, set a background image for the splash screen
-    try:
-        splash_bg = tk.PhotoImage(file="background.png")
-        bg_label = tk.Label(splash, image=splash_bg)
-        bg_label.image = splash_bg  # keep a reference
-        bg_label.place(x=0, y=0, relwidth=1, relheight=1)
-    except Exception:
-        splash.configure(bg="#f0f2f5")
-
-    tk.Label(splash, text="Loading WhatsApp Bot...", font=("Helvetica", 16), bg="white").pack(pady=20)
-    splash_progress = ttk.Progressbar(splash, orient="horizontal", length=300, mode="determinate")
-    splash_progress.pack(pady=20)
-    splash_progress['maximum'] = 100
-
-    def update_progress(progress=0):
-        splash_progress['value'] = progress
-        if progress < 100:
-            splash.after(30, update_progress, progress+1)
-        else:
-            splash.destroy()
-            root.deiconify()  # Show main window
-
-    update_progress()
-
-# ----------------------- GUI Setup -----------------------
-root = tk.Tk()
-root.title("WhatsApp Bulk Messaging Bot")
-# Initially hide the main window
-root.withdraw()
-
-# Set up a background image replacing the grey color
-try:
-    background_image = tk.PhotoImage(file="background.png")
-    bg_label = tk.Label(root, image=background_image)
-    bg_label.place(x=0, y=0, relwidth=1, relheight=1)
-except Exception as e:
-    print("Background image not found. Continuing with default background.")
-
-# Note: If you want the splash screen background to show through, adjust widget backgrounds accordingly.
-
-style = ttk.Style()
-style.theme_use("clam")
-# These widget styles have explicit backgrounds. Adjust them if you want more transparency.
-style.configure("TFrame", background="white")
-style.configure("TLabel", background="white", foreground="#333", font=("Helvetica", 11))
-style.configure("Header.TLabel", background="#f0f2f5", foreground="#333", font=("Helvetica", 14, "bold"))
-style.configure("TButton", background="#ffffff", foreground="#333", font=("Helvetica", 11), padding=6)
-style.configure("green.Horizontal.TProgressbar", troughcolor="#ccc", background="#4caf50", darkcolor="#4caf50", lightcolor="#4caf50")
-
-# Top Logo Frame
-logo_frame = tk.Frame(root, bg="#f0f2f5")
-logo_frame.pack(pady=10)
-try:
-    logo_img = tk.PhotoImage(file="logo.png")
-    logo_label = tk.Label(logo_frame, image=logo_img, bg="#f0f2f5")
-    logo_label.pack()
-except Exception:
-    pass
-
-# Configuration Frame
-config_container = tk.Frame(root, bg="#f0f2f5")
-config_container.pack(pady=5)
-config_frame = ttk.Frame(config_container, style="TFrame")
-config_frame.pack(padx=10, pady=10)
-
-ttk.Label(config_frame, text="Default Country Code:", style="TLabel").grid(row=0, column=0, padx=5, pady=3, sticky=tk.E)
-country_code_entry = ttk.Entry(config_frame, width=10)
-country_code_entry.insert(0, config_defaults.get('default_country_code', '+20'))
-country_code_entry.grid(row=0, column=1, padx=5, pady=3)
-
-ttk.Label(config_frame, text="Delay Between Messages (sec):", style="TLabel").grid(row=1, column=0, padx=5, pady=3, sticky=tk.E)
-delay_entry = ttk.Entry(config_frame, width=10)
-delay_entry.insert(0, config_defaults.get('delay_between', '2'))
-delay_entry.grid(row=1, column=1, padx=5, pady=3)
-
-ttk.Label(config_frame, text="WebDriver Timeout (sec):", style="TLabel").grid(row=2, column=0, padx=5, pady=3, sticky=tk.E)
-timeout_entry = ttk.Entry(config_frame, width=10)
-timeout_entry.insert(0, config_defaults.get('wait_timeout', '20'))
-timeout_entry.grid(row=2, column=1, padx=5, pady=3)
-
-ttk.Label(config_frame, text="Max Retries:", style="TLabel").grid(row=3, column=0, padx=5, pady=3, sticky=tk.E)
-retry_entry = ttk.Entry(config_frame, width=10)
-retry_entry.insert(0, config_defaults.get('max_retries', '2'))
-retry_entry.grid(row=3, column=1, padx=5, pady=3)
-
-ttk.Label(config_frame, text="Browser:", style="TLabel").grid(row=4, column=0, padx=5, pady=3, sticky=tk.E)
-browser_var = tk.StringVar()
-browser_choices = ["Chrome", "Firefox"]
-browser_var.set(config_defaults.get('browser', "Chrome"))
-browser_menu = ttk.OptionMenu(config_frame, browser_var, browser_var.get(), *browser_choices)
-browser_menu.grid(row=4, column=1, padx=5, pady=3)
-
-ttk.Label(config_frame, text="Global Schedule Start (HH:MM:SS):", style="TLabel").grid(row=5, column=0, padx=5, pady=3, sticky=tk.E)
-schedule_entry = ttk.Entry(config_frame, width=10)
-schedule_entry.insert(0, "")
-schedule_entry.grid(row=5, column=1, padx=5, pady=3)
-
-resume_var = tk.BooleanVar()
-resume_check = ttk.Checkbutton(config_frame, text="Resume from last progress", variable=resume_var)
-resume_check.grid(row=6, column=0, columnspan=2, pady=3)
-
-# Settings Button for Advanced Settings
-settings_button = ttk.Button(config_container, text="Settings", command=open_settings)
-settings_button.pack(pady=5)
-
-# Button Frame
-button_container = tk.Frame(root, bg="#f0f2f5")
-button_container.pack(pady=5)
-button_frame = ttk.Frame(button_container, style="TFrame")
-button_frame.pack(padx=10, pady=10)
-try:
-    start_img = tk.PhotoImage(file="start.png")
-except Exception:
-    start_img = None
-try:
-    pause_img = tk.PhotoImage(file="pause.png")
-except Exception:
-    pause_img = None
-try:
-    stop_img = tk.PhotoImage(file="stop.png")
-except Exception:
-    stop_img = None
-
-start_button = ttk.Button(button_frame, text="Start Messaging", command=start_thread, image=start_img,
-                          compound=tk.LEFT, style="TButton")
-start_button.grid(row=0, column=0, padx=10)
-pause_button = ttk.Button(button_frame, text="Pause Messaging", command=toggle_pause, image=pause_img,
-                          compound=tk.LEFT, style="TButton")
-pause_button.grid(row=0, column=1, padx=10)
-stop_button = ttk.Button(button_frame, text="Stop Messaging", command=request_stop, image=stop_img,
-                         compound=tk.LEFT, style="TButton")
-stop_button.grid(row=0, column=2, padx=10)
-
-# Counters, Progress, and Estimated Time
-status_frame = tk.Frame(root, bg="#f0f2f5")
-status_frame.pack(pady=10)
-sent_label = tk.Label(status_frame, text="Messages Sent: 0/0", font=("Helvetica", 12), bg="#f0f2f5")
-sent_label.pack(pady=2)
-failed_label = tk.Label(status_frame, text="Messages Failed: 0/0", font=("Helvetica", 12), bg="#f0f2f5")
-failed_label.pack(pady=2)
-progress_label = tk.Label(status_frame, text="Processed: 0/0", font=("Helvetica", 12), bg="#f0f2f5")
-progress_label.pack(pady=2)
-progress_bar = ttk.Progressbar(status_frame, orient="horizontal", length=300, mode="determinate",
-                               style="green.Horizontal.TProgressbar")
-progress_bar.pack(pady=5)
-estimated_time_label = tk.Label(status_frame, text="Estimated Time Remaining: -- sec", font=("Helvetica", 12), bg="#f0f2f5")
-estimated_time_label.pack(pady=2)
-
-# Treeview for Contact Status
-tree_frame = ttk.Frame(root, style="TFrame")
-tree_frame.pack(pady=5, fill=tk.BOTH, expand=True)
-tree = ttk.Treeview(tree_frame, columns=("Number", "Text", "Image", "Video", "File", "Schedule"),
-                    show="headings", height=8)
-for col in ("Number", "Text", "Image", "Video", "File", "Schedule"):
-    tree.heading(col, text=col)
-tree.pack(pady=5, fill=tk.BOTH, expand=True)
-
-# Log Text Widget
-log_frame = ttk.Frame(root, style="TFrame")
-log_frame.pack(pady=10, fill=tk.BOTH, expand=True)
-log_text = tk.Text(log_frame, height=10, width=70, bg="white", fg="#333", font=("Helvetica", 10))
-log_text.pack(pady=5, padx=5, fill=tk.BOTH, expand=True)
-log_text.insert(tk.END, "Logs will appear here...\n")
-
-# Start the splash screen, then launch the main window
-root.after(0, show_splash_screen)
-root.after(100, process_log_queue)
-root.mainloop()
+import threading
+import tkinter as tk
+from tkinter import messagebox, filedialog, ttk
+import logging
+import queue
+
+from bot_config import load_config, save_config
+from gui_updates import UpdateChannel
+from log_setup import LOG_FILE, setup_logging_from_config
+from rate_limiter import rate_from_delay
+from send_engine import BulkSendEngine, EngineListener, STATUS_COLUMNS
+from status_view import StatusStore, StatusTable
+# Re-exported for scripts that imported them from this module before the split
+from send_engine import run_messaging  # noqa: F401
+from whatsapp_client import WhatsAppBot  # noqa: F401
+
+# ----------------------- Engine -> GUI Bridge -----------------------
+# Called on worker threads: everything goes through the update channel, which the
+# Tk thread drains UI_REFRESH_MS apart.
+UI_REFRESH_MS = 100
+
+# Log pane: keeps the newest LOG_MAX_LINES lines; a backlog bigger than LOG_BACKLOG_LIMIT
+# is collapsed to its last LOG_BACKLOG_TAIL lines plus a summary line
+LOG_MAX_LINES = 2000
+LOG_BACKLOG_LIMIT = 500
+LOG_BACKLOG_TAIL = 200
+
+class TkListener(EngineListener):
+    # One per engine, with a channel of its own: BotApp.start_thread closes the previous
+    # engine's channel, so late updates from a stopped campaign are dropped
+    def __init__(self, app):
+        self.app = app
+        self.updates = UpdateChannel()
+
+    def prompt(self, title, message):
+        self.updates.call(messagebox.showinfo, title, message)
+
+    def on_log(self, msg):
+        self.app.log_queue.put(msg)
+
+    def on_contacts_loaded(self, contacts):
+        self.updates.add_contacts(contacts)
+
+    def on_status(self, index, column, value):
+        self.updates.set_status(index, column, value)
+
+    def on_progress(self, engine):
+        self.updates.progress()
+
+    def on_error(self, title, message):
+        self.updates.post(self.app.show_error, title, message)
+
+    def on_finished(self, engine):
+        self.updates.progress()
+        self.updates.post(self.app.show_summary, engine)
+
+# ----------------------- Main Window -----------------------
+class BotApp:
+    def __init__(self, root):
+        self.root = root
+        self.config_defaults = load_config()
+        self.log_queue = queue.Queue()
+        self.updates = UpdateChannel()
+        self.engine = None
+        self.build_widgets()
+
+    # ----------------------- Helper Functions -----------------------
+    def update_labels(self):
+        engine = self.engine
+        if engine is None:
+            return
+        total = engine.total_contacts
+        with engine.counter_lock:
+            sent, failed, skipped = engine.messages_sent, engine.messages_failed, engine.messages_skipped
+        self.sent_label.config(text=f"Messages Sent: {sent}/{total}")
+        self.failed_label.config(text=f"Messages Failed: {failed}/{total}")
+        skipped_text = f" ({skipped} suppressed/duplicate)" if skipped else ""
+        self.progress_label.config(text=f"Processed: {sent + failed + skipped}/{total}{skipped_text}")
+        self.progress_bar['value'] = engine.progress_percent()
+
+        # Update estimated time remaining if messaging has started
+        remaining = engine.estimated_remaining()
+        if remaining is not None:
+            self.estimated_time_label.config(text=f"Estimated Time Remaining: {int(remaining)} sec")
+        else:
+            self.estimated_time_label.config(text="Estimated Time Remaining: -- sec")
+        self.sessions_label.config(text=engine.pool_summary())
+
+    def pump_updates(self):
+        # One batch per frame: rows, coalesced statuses, one label refresh, queued calls
+        try:
+            batch = self.updates.drain()
+            for contacts in batch.contacts:
+                self.status_store.append(contacts)
+            for (index, column), value in batch.statuses.items():
+                self.status_store.set(index, column, value)
+            self.status_table.refresh()
+            if batch.progress:
+                self.update_labels()
+            self.updates.run_calls(batch)
+        except Exception:
+            logging.exception("GUI update failed.")
+        finally:
+            self.root.after(UI_REFRESH_MS, self.pump_updates)
+
+    def show_error(self, title, message):
+        messagebox.showerror(title, message)
+        self.start_button.config(state=tk.NORMAL)
+
+    def show_summary(self, engine):
+        messagebox.showinfo("Summary", f"Total Contacts: {engine.total_contacts}\nMessages Sent: {engine.messages_sent}\nMessages Failed: {engine.messages_failed}\nSkipped (suppressed/duplicate): {engine.messages_skipped}")
+        self.start_button.config(state=tk.NORMAL)
+
+    def drain_log_queue(self):
+        messages = []
+        try:
+            while True:
+                messages.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if len(messages) > LOG_BACKLOG_LIMIT:
+            # Far behind: show the newest lines and a summary instead of every message
+            skipped = len(messages) - LOG_BACKLOG_TAIL
+            log_file = self.config_defaults.get('log_file', LOG_FILE)
+            messages = [f"... {skipped} log lines skipped (full log in {log_file}) ..."] + messages[-LOG_BACKLOG_TAIL:]
+        return messages
+
+    def process_log_queue(self):
+        messages = self.drain_log_queue()
+        if messages:
+            # Only follow the tail if the user hasn't scrolled up to read something
+            at_bottom = self.log_text.yview()[1] >= 1.0
+            self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+            line_count = int(self.log_text.index("end-1c").split(".")[0])
+            if line_count > LOG_MAX_LINES:
+                self.log_text.delete("1.0", f"{line_count - LOG_MAX_LINES + 1}.0")
+            if at_bottom:
+                self.log_text.see(tk.END)
+        self.root.after(100, self.process_log_queue)
+
+    def log_message(self, msg):
+        self.log_queue.put(msg)
+        logging.info(msg)
+
+    # ----------------------- Advanced Settings Dialog -----------------------
+    def open_settings(self):
+        settings_win = tk.Toplevel(self.root)
+        settings_win.title("Advanced Settings")
+        settings_win.geometry("340x655")
+        settings_win.configure(bg="#f0f2f5")
+
+        persistent_var = tk.BooleanVar()
+        persistent_var.set(self.config_defaults.get('persistent_session', 'False') == 'True')
+
+        tk.Label(settings_win, text="Persistent Session:", bg="#f0f2f5", font=("Helvetica", 11)).pack(pady=10)
+        tk.Checkbutton(settings_win, text="Keep session (avoid re-scan QR code)", variable=persistent_var, bg="#f0f2f5", font=("Helvetica", 10)).pack()
+
+        in_app_var = tk.BooleanVar()
+        in_app_var.set(self.config_defaults.get('chat_navigation', 'in_app') == 'in_app')
+
+        tk.Label(settings_win, text="Chat Navigation:", bg="#f0f2f5", font=("Helvetica", 11)).pack(pady=5)
+        tk.Checkbutton(settings_win, text="Switch chats in-app (no page reload)", variable=in_app_var, bg="#f0f2f5", font=("Helvetica", 10)).pack()
+
+        captions_var = tk.BooleanVar()
+        captions_var.set(self.config_defaults.get('media_captions', 'True') == 'True')
+        tk.Checkbutton(settings_win, text="Send message as the attachment's caption", variable=captions_var, bg="#f0f2f5", font=("Helvetica", 10)).pack()
+
+        preprocess_var = tk.BooleanVar()
+        preprocess_var.set(self.config_defaults.get('media_preprocessing', 'True') == 'True')
+        tk.Checkbutton(settings_win, text="Shrink large images/videos before sending", variable=preprocess_var, bg="#f0f2f5", font=("Helvetica", 10)).pack()
+
+        tk.Label(settings_win, text="Opt-out (Suppression) List:", bg="#f0f2f5", font=("Helvetica", 11)).pack(pady=5)
+        suppression_frame = tk.Frame(settings_win, bg="#f0f2f5")
+        suppression_frame.pack()
+        suppression_entry = ttk.Entry(suppression_frame, width=28)
+        suppression_entry.insert(0, self.config_defaults.get('suppression_list', ''))
+        suppression_entry.pack(side=tk.LEFT, padx=3)
+
+        def browse_suppression():
+            path = filedialog.askopenfilename(title="Select Opt-out List", parent=settings_win,
+                                              filetypes=(("Text/CSV files", "*.txt *.csv"), ("All files", "*.*")))
+            if path:
+                suppression_entry.delete(0, tk.END)
+                suppression_entry.insert(0, path)
+
+        ttk.Button(suppression_frame, text="Browse", command=browse_suppression).pack(side=tk.LEFT)
+
+        skip_duplicates_var = tk.BooleanVar()
+        skip_duplicates_var.set(self.config_defaults.get('skip_duplicates', 'True') == 'True')
+        tk.Checkbutton(settings_win, text="Skip repeated numbers in a campaign", variable=skip_duplicates_var, bg="#f0f2f5", font=("Helvetica", 10)).pack(pady=5)
+
+        tk.Label(settings_win, text="Schedule Timezone:", bg="#f0f2f5", font=("Helvetica", 11)).pack(pady=5)
+        timezone_entry = ttk.Entry(settings_win, width=28)
+        timezone_entry.insert(0, self.config_defaults.get('schedule_timezone', ''))
+        timezone_entry.pack()
+        tk.Label(settings_win, text="Blank: this computer, 'recipient': by country code,\nor a name like Africa/Cairo",
+                 bg="#f0f2f5", font=("Helvetica", 9)).pack()
+
+        tk.Label(settings_win, text="Burst (messages back to back per account):", bg="#f0f2f5", font=("Helvetica", 11)).pack(pady=5)
+        burst_entry = ttk.Entry(settings_win, width=10)
+        burst_entry.insert(0, self.config_defaults.get('burst', '1'))
+        burst_entry.pack()
+
+        tk.Label(settings_win, text="Max Messages/Minute, all sessions (0 = no cap):", bg="#f0f2f5", font=("Helvetica", 11)).pack(pady=5)
+        global_rate_entry = ttk.Entry(settings_win, width=10)
+        global_rate_entry.insert(0, self.config_defaults.get('global_rate_per_minute', '0'))
+        global_rate_entry.pack()
+
+        adaptive_var = tk.BooleanVar()
+        adaptive_var.set(self.config_defaults.get('adaptive_pacing', 'False') == 'True')
+        tk.Checkbutton(settings_win, text="Adaptive pacing (speed up while sends succeed)", variable=adaptive_var, bg="#f0f2f5", font=("Helvetica", 10)).pack(pady=5)
+        pacing_frame = tk.Frame(settings_win, bg="#f0f2f5")
+        pacing_frame.pack()
+        tk.Label(pacing_frame, text="Min/Max per minute:", bg="#f0f2f5", font=("Helvetica", 10)).pack(side=tk.LEFT)
+        min_rate_entry = ttk.Entry(pacing_frame, width=6)
+        min_rate_entry.insert(0, self.config_defaults.get('min_rate_per_minute', '2'))
+        min_rate_entry.pack(side=tk.LEFT, padx=3)
+        max_rate_entry = ttk.Entry(pacing_frame, width=6)
+        max_rate_entry.insert(0, self.config_defaults.get('max_rate_per_minute', '60'))
+        max_rate_entry.pack(side=tk.LEFT, padx=3)
+
+        def save_settings():
+            try:
+                burst = max(1.0, float(burst_entry.get().strip()))
+                global_rate = max(0.0, float(global_rate_entry.get().strip()))
+                min_rate = max(0.1, float(min_rate_entry.get().strip()))
+                max_rate = max(min_rate, float(max_rate_entry.get().strip()))
+            except ValueError:
+                messagebox.showerror("Invalid Setting", "Burst and messages per minute must be numbers.", parent=settings_win)
+                return
+            self.config_defaults['adaptive_pacing'] = str(adaptive_var.get())
+            self.config_defaults['min_rate_per_minute'] = f"{min_rate:g}"
+            self.config_defaults['max_rate_per_minute'] = f"{max_rate:g}"
+            self.config_defaults['burst'] = f"{burst:g}"
+            self.config_defaults['global_rate_per_minute'] = f"{global_rate:g}"
+            if self.engine is not None:
+                self.engine.set_rate(burst=burst, global_per_minute=global_rate)
+            self.config_defaults['persistent_session'] = str(persistent_var.get())
+            self.config_defaults['chat_navigation'] = 'in_app' if in_app_var.get() else 'url'
+            self.config_defaults['media_captions'] = str(captions_var.get())
+            self.config_defaults['media_preprocessing'] = str(preprocess_var.get())
+            self.config_defaults['suppression_list'] = suppression_entry.get().strip()
+            self.config_defaults['skip_duplicates'] = str(skip_duplicates_var.get())
+            self.config_defaults['schedule_timezone'] = timezone_entry.get().strip()
+            save_config(self.config_defaults)
+            messagebox.showinfo("Settings Saved", "Advanced settings have been updated.")
+            settings_win.destroy()
+
+        tk.Button(settings_win, text="Save", command=save_settings, font=("Helvetica", 11)).pack(pady=10)
+
+    # ----------------------- GUI Functions -----------------------
+    def start_thread(self):
+        file_path = filedialog.askopenfilename(title="Select Contact List",
+                                               filetypes=(("Contact lists", "*.xlsx *.csv *.tsv *.parquet"), ("Excel files", "*.xlsx"),
+                                                          ("CSV/TSV files", "*.csv *.tsv"), ("Parquet files", "*.parquet"),
+                                                          ("All files", "*.*")))
+        if not file_path:
+            return
+        default_code = self.country_code_entry.get().strip()
+        if not default_code.startswith('+'):
+            default_code = '+' + default_code
+        try:
+            delay_between = float(self.delay_entry.get().strip())
+        except:
+            delay_between = 2.0
+        try:
+            wait_timeout = float(self.timeout_entry.get().strip())
+        except:
+            wait_timeout = 20.0
+        schedule_time = self.schedule_entry.get().strip()
+        browser_choice = self.browser_var.get()
+        try:
+            max_retries = int(self.retry_entry.get().strip())
+        except:
+            max_retries = 2
+        try:
+            sessions = max(1, int(self.sessions_entry.get().strip()))
+        except:
+            sessions = 1
+        persistent_session = self.config_defaults.get('persistent_session', 'False') == 'True'
+        navigation = self.config_defaults.get('chat_navigation', 'in_app')
+        suppression_list = self.config_defaults.get('suppression_list', '')
+        skip_duplicates = self.config_defaults.get('skip_duplicates', 'True') == 'True'
+        try:
+            metrics_port = int(self.config_defaults.get('metrics_port', '0'))
+        except ValueError:
+            metrics_port = 0
+        metrics_file = self.config_defaults.get('metrics_file', '')
+        schedule_timezone = self.config_defaults.get('schedule_timezone', '')
+        try:
+            burst = max(1.0, float(self.config_defaults.get('burst', '1')))
+            global_rate = max(0.0, float(self.config_defaults.get('global_rate_per_minute', '0')))
+            min_rate = float(self.config_defaults.get('min_rate_per_minute', '2'))
+            max_rate = float(self.config_defaults.get('max_rate_per_minute', '60'))
+        except ValueError:
+            burst, global_rate, min_rate, max_rate = 1.0, 0.0, 2.0, 60.0
+        adaptive_pacing = self.config_defaults.get('adaptive_pacing', 'False') == 'True'
+        media_captions = self.config_defaults.get('media_captions', 'True') == 'True'
+        media_preprocessing = self.config_defaults.get('media_preprocessing', 'True') == 'True'
+        media_cache_dir = self.config_defaults.get('media_cache_dir', 'media_cache')
+
+        # Keep the advanced settings, only overwrite what the main window edits
+        new_config = dict(self.config_defaults)
+        new_config.update({
+            'default_country_code': default_code,
+            'delay_between': str(delay_between),
+            'wait_timeout': str(wait_timeout),
+            'browser': browser_choice,
+            'max_retries': str(max_retries),
+            'persistent_session': str(persistent_session),
+            'sessions': str(sessions)
+        })
+        save_config(new_config)
+
+        # Switch to the new campaign's channel before it can post anything
+        listener = TkListener(self)
+        self.updates.close()
+        self.updates = listener.updates
+        self.engine = BulkSendEngine(default_code, delay_between, wait_timeout, browser_choice, max_retries,
+                                     persistent_session, schedule_time=schedule_time,
+                                     resume=self.resume_var.get(), navigation=navigation,
+                                     sessions=sessions, suppression_list=suppression_list,
+                                     skip_duplicates=skip_duplicates, metrics_port=metrics_port,
+                                     metrics_file=metrics_file, schedule_timezone=schedule_timezone,
+                                     burst=burst, global_rate_per_minute=global_rate,
+                                     adaptive_pacing=adaptive_pacing, min_rate_per_minute=min_rate,
+                                     max_rate_per_minute=max_rate, media_captions=media_captions,
+                                     media_preprocessing=media_preprocessing,
+                                     media_cache_dir=media_cache_dir, listener=listener)
+        self.status_store.clear()
+        self.status_table.reset()
+        self.start_button.config(state=tk.DISABLED)
+        threading.Thread(target=self.engine.run, args=(file_path,), daemon=True).start()
+
+    def toggle_pause(self):
+        if self.engine is None:
+            return
+        if not self.engine.paused:
+            self.engine.pause()
+            self.pause_button.config(text="Resume Messaging")
+            self.log_message("Messaging paused.")
+        else:
+            self.engine.resume_sending()
+            self.pause_button.config(text="Pause Messaging")
+            self.log_message("Messaging resumed.")
+
+    def apply_delay(self):
+        try:
+            delay_between = float(self.delay_entry.get().strip())
+        except ValueError:
+            messagebox.showerror("Invalid Delay", "Please enter the delay in seconds, e.g. 2 or 0.5")
+            return
+        if self.engine is not None:
+            self.engine.set_rate(rate_from_delay(delay_between))
+
+    def request_stop(self):
+        if self.engine is not None:
+            self.engine.request_stop()
+        self.log_message("Stop button clicked. Requesting stop...")
+        self.start_button.config(state=tk.NORMAL)
+
+    # ----------------------- Splash Screen Function -----------------------
+    def show_splash_screen(self):
+        root = self.root
+        splash = tk.Toplevel()
+        splash.overrideredirect(True)
+        splash_width = 400
+        splash_height = 200
+        screen_width = root.winfo_screenwidth()
+        screen_height = root.winfo_screenheight()
+        x = int((screen_width/2) - (splash_width/2))
+        y = int((screen_height/2) - (splash_height/2))
+        splash.geometry(f"{splash_width}x{splash_height}+{x}+{y}")
+
+        # Optionally, set a background image for the splash screen
+        try:
+            splash_bg = tk.PhotoImage(file="background.png")
+            bg_label = tk.Label(splash, image=splash_bg)
+            bg_label.image = splash_bg  # keep a reference
+            bg_label.place(x=0, y=0, relwidth=1, relheight=1)
+        except Exception:
+            splash.configure(bg="#f0f2f5")
+
+        tk.Label(splash, text="Loading WhatsApp Bot...", font=("Helvetica", 16), bg="white").pack(pady=20)
+        splash_progress = ttk.Progressbar(splash, orient="horizontal", length=300, mode="determinate")
+        splash_progress.pack(pady=20)
+        splash_progress['maximum'] = 100
+
+        def update_progress(progress=0):
+            splash_progress['value'] = progress
+            if progress < 100:
+                splash.after(30, update_progress, progress+1)
+            else:
+                splash.destroy()
+                root.deiconify()  # Show main window
+
+        update_progress()
+
+    # ----------------------- GUI Setup -----------------------
+    def build_widgets(self):
+        root = self.root
+        config_defaults = self.config_defaults
+        root.title("WhatsApp Bulk Messaging Bot")
+        # Initially hide the main window
+        root.withdraw()
+
+        # Set up a background image replacing the grey color
+        try:
+            self.background_image = tk.PhotoImage(file="background.png")
+            bg_label = tk.Label(root, image=self.background_image)
+            bg_label.place(x=0, y=0, relwidth=1, relheight=1)
+        except Exception as e:
+            print("Background image not found. Continuing with default background.")
+
+        # Note: If you want the splash screen background to show through, adjust widget backgrounds accordingly.
+
+        style = ttk.Style()
+        style.theme_use("clam")
+        # These widget styles have explicit backgrounds. Adjust them if you want more transparency.
+        style.configure("TFrame", background="white")
+        style.configure("TLabel", background="white", foreground="#333", font=("Helvetica", 11))
+        style.configure("Header.TLabel", background="#f0f2f5", foreground="#333", font=("Helvetica", 14, "bold"))
+        style.configure("TButton", background="#ffffff", foreground="#333", font=("Helvetica", 11), padding=6)
+        style.configure("green.Horizontal.TProgressbar", troughcolor="#ccc", background="#4caf50", darkcolor="#4caf50", lightcolor="#4caf50")
+
+        # Top Logo Frame
+        logo_frame = tk.Frame(root, bg="#f0f2f5")
+        logo_frame.pack(pady=10)
+        try:
+            self.logo_img = tk.PhotoImage(file="logo.png")
+            logo_label = tk.Label(logo_frame, image=self.logo_img, bg="#f0f2f5")
+            logo_label.pack()
+        except Exception:
+            pass
+
+        # Configuration Frame
+        config_container = tk.Frame(root, bg="#f0f2f5")
+        config_container.pack(pady=5)
+        config_frame = ttk.Frame(config_container, style="TFrame")
+        config_frame.pack(padx=10, pady=10)
+
+        ttk.Label(config_frame, text="Default Country Code:", style="TLabel").grid(row=0, column=0, padx=5, pady=3, sticky=tk.E)
+        self.country_code_entry = ttk.Entry(config_frame, width=10)
+        self.country_code_entry.insert(0, config_defaults.get('default_country_code', '+20'))
+        self.country_code_entry.grid(row=0, column=1, padx=5, pady=3)
+
+        ttk.Label(config_frame, text="Delay Between Messages (sec):", style="TLabel").grid(row=1, column=0, padx=5, pady=3, sticky=tk.E)
+        self.delay_entry = ttk.Entry(config_frame, width=10)
+        self.delay_entry.insert(0, config_defaults.get('delay_between', '2'))
+        self.delay_entry.grid(row=1, column=1, padx=5, pady=3)
+        # Takes effect immediately while a campaign runs
+        self.delay_entry.bind("<Return>", lambda e: self.apply_delay())
+        ttk.Button(config_frame, text="Apply", width=6, command=self.apply_delay).grid(row=1, column=2, padx=5, pady=3)
+
+        ttk.Label(config_frame, text="WebDriver Timeout (sec):", style="TLabel").grid(row=2, column=0, padx=5, pady=3, sticky=tk.E)
+        self.timeout_entry = ttk.Entry(config_frame, width=10)
+        self.timeout_entry.insert(0, config_defaults.get('wait_timeout', '20'))
+        self.timeout_entry.grid(row=2, column=1, padx=5, pady=3)
+
+        ttk.Label(config_frame, text="Max Retries:", style="TLabel").grid(row=3, column=0, padx=5, pady=3, sticky=tk.E)
+        self.retry_entry = ttk.Entry(config_frame, width=10)
+        self.retry_entry.insert(0, config_defaults.get('max_retries', '2'))
+        self.retry_entry.grid(row=3, column=1, padx=5, pady=3)
+
+        ttk.Label(config_frame, text="Browser:", style="TLabel").grid(row=4, column=0, padx=5, pady=3, sticky=tk.E)
+        self.browser_var = tk.StringVar()
+        browser_choices = ["Chrome", "Firefox"]
+        self.browser_var.set(config_defaults.get('browser', "Chrome"))
+        browser_menu = ttk.OptionMenu(config_frame, self.browser_var, self.browser_var.get(), *browser_choices)
+        browser_menu.grid(row=4, column=1, padx=5, pady=3)
+
+        ttk.Label(config_frame, text="Global Schedule Start (HH:MM or date):", style="TLabel").grid(row=5, column=0, padx=5, pady=3, sticky=tk.E)
+        self.schedule_entry = ttk.Entry(config_frame, width=16)
+        self.schedule_entry.insert(0, "")
+        self.schedule_entry.grid(row=5, column=1, padx=5, pady=3)
+
+        ttk.Label(config_frame, text="Parallel Sessions (accounts):", style="TLabel").grid(row=6, column=0, padx=5, pady=3, sticky=tk.E)
+        self.sessions_entry = ttk.Entry(config_frame, width=10)
+        self.sessions_entry.insert(0, config_defaults.get('sessions', '1'))
+        self.sessions_entry.grid(row=6, column=1, padx=5, pady=3)
+
+        self.resume_var = tk.BooleanVar()
+        resume_check = ttk.Checkbutton(config_frame, text="Resume from last progress", variable=self.resume_var)
+        resume_check.grid(row=7, column=0, columnspan=2, pady=3)
+
+        # Settings Button for Advanced Settings
+        settings_button = ttk.Button(config_container, text="Settings", command=self.open_settings)
+        settings_button.pack(pady=5)
+
+        # Button Frame
+        button_container = tk.Frame(root, bg="#f0f2f5")
+        button_container.pack(pady=5)
+        button_frame = ttk.Frame(button_container, style="TFrame")
+        button_frame.pack(padx=10, pady=10)
+        try:
+            self.start_img = tk.PhotoImage(file="start.png")
+        except Exception:
+            self.start_img = None
+        try:
+            self.pause_img = tk.PhotoImage(file="pause.png")
+        except Exception:
+            self.pause_img = None
+        try:
+            self.stop_img = tk.PhotoImage(file="stop.png")
+        except Exception:
+            self.stop_img = None
+
+        self.start_button = ttk.Button(button_frame, text="Start Messaging", command=self.start_thread, image=self.start_img,
+                                       compound=tk.LEFT, style="TButton")
+        self.start_button.grid(row=0, column=0, padx=10)
+        self.pause_button = ttk.Button(button_frame, text="Pause Messaging", command=self.toggle_pause, image=self.pause_img,
+                                       compound=tk.LEFT, style="TButton")
+        self.pause_button.grid(row=0, column=1, padx=10)
+        self.stop_button = ttk.Button(button_frame, text="Stop Messaging", command=self.request_stop, image=self.stop_img,
+                                      compound=tk.LEFT, style="TButton")
+        self.stop_button.grid(row=0, column=2, padx=10)
+
+        # Counters, Progress, and Estimated Time
+        status_frame = tk.Frame(root, bg="#f0f2f5")
+        status_frame.pack(pady=10)
+        self.sent_label = tk.Label(status_frame, text="Messages Sent: 0/0", font=("Helvetica", 12), bg="#f0f2f5")
+        self.sent_label.pack(pady=2)
+        self.failed_label = tk.Label(status_frame, text="Messages Failed: 0/0", font=("Helvetica", 12), bg="#f0f2f5")
+        self.failed_label.pack(pady=2)
+        self.progress_label = tk.Label(status_frame, text="Processed: 0/0", font=("Helvetica", 12), bg="#f0f2f5")
+        self.progress_label.pack(pady=2)
+        self.progress_bar = ttk.Progressbar(status_frame, orient="horizontal", length=300, mode="determinate",
+                                            style="green.Horizontal.TProgressbar")
+        self.progress_bar.pack(pady=5)
+        self.estimated_time_label = tk.Label(status_frame, text="Estimated Time Remaining: -- sec", font=("Helvetica", 12), bg="#f0f2f5")
+        self.estimated_time_label.pack(pady=2)
+        self.sessions_label = tk.Label(status_frame, text="", font=("Helvetica", 10), bg="#f0f2f5")
+        self.sessions_label.pack(pady=2)
+
+        # Contact Status (virtualized: only the visible rows exist as Treeview items)
+        tree_frame = ttk.Frame(root, style="TFrame")
+        tree_frame.pack(pady=5, fill=tk.BOTH, expand=True)
+        tree_toolbar = ttk.Frame(tree_frame, style="TFrame")
+        tree_toolbar.pack(fill=tk.X)
+        ttk.Label(tree_toolbar, text="Click a column header to sort.", style="TLabel").pack(side=tk.LEFT, padx=5)
+        ttk.Button(tree_toolbar, text="Next Failure", command=lambda: self.status_table.jump_to_next("Failed")).pack(side=tk.RIGHT, padx=5)
+        self.status_store = StatusStore()
+        self.status_table = StatusTable(tree_frame, self.status_store, STATUS_COLUMNS, refresh_ms=None, style="TFrame")
+        self.status_table.pack(pady=5, fill=tk.BOTH, expand=True)
+
+        # Log Text Widget
+        log_frame = ttk.Frame(root, style="TFrame")
+        log_frame.pack(pady=10, fill=tk.BOTH, expand=True)
+        self.log_text = tk.Text(log_frame, height=10, width=70, bg="white", fg="#333", font=("Helvetica", 10))
+        self.log_text.pack(pady=5, padx=5, fill=tk.BOTH, expand=True)
+        self.log_text.insert(tk.END, "Logs will appear here...\n")
+
+def main():
+    setup_logging_from_config(load_config())
+    root = tk.Tk()
+    app = BotApp(root)
+    # Start the splash screen, then launch the main window
+    root.after(0, app.show_splash_screen)
+    root.after(100, app.process_log_queue)
+    root.after(UI_REFRESH_MS, app.pump_updates)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
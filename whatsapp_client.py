@@ -0,0 +1,442 @@
+import logging
+import os
+import re
+import time
+import urllib.parse
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+
+from cancellation import CancelToken
+from driver_cache import resolve_driver
+
+WHATSAPP_URL = "https://web.whatsapp.com"
+# Chat list pane, only present once the QR code has been scanned
+LOGGED_IN_XPATH = '//div[@id="pane-side"]'
+LOGIN_TIMEOUT = 300
+
+# Chat navigation: "in_app" keeps the loaded web app and switches chats client-side,
+# "url" reloads /send?phone=... for every contact (slow, but always works)
+NAVIGATION_MODES = ("in_app", "url")
+MAIN_PANEL_XPATH = '//div[@id="main"]'
+COMPOSE_BOX_XPATH = '//div[@id="main"]//footer//div[@contenteditable="true"]'
+# Header of the open chat (shows the number for unsaved contacts) and the message bubbles,
+# whose data-id embeds the chat's JID ("true_<digits>@c.us_<id>")
+CHAT_HEADER_XPATH = '//div[@id="main"]//header'
+CHAT_MESSAGE_ID_XPATH = '//div[@id="main"]//div[@data-id]'
+# How long a freshly switched chat gets to show something that identifies the contact
+CHAT_VERIFY_TIMEOUT = 2
+NEW_CHAT_XPATH = '//span[@data-icon="new-chat-outline" or @data-icon="chat"]'
+NEW_CHAT_SEARCH_XPATH = '//div[@contenteditable="true"][@data-tab="3"]'
+INVALID_NUMBER_POPUP_XPATH = '//div[@data-animate-modal-popup="true"]'
+SEARCH_RESULT_XPATH = '//div[@aria-label="Search results."]//div[@role="listitem"]'
+SEND_BUTTON_XPATH = '//span[@data-icon="send"]'
+ATTACH_BUTTON_XPATH = '//button[@title="Attach"]'
+FILE_INPUT_XPATH = '//input[@type="file"]'
+# Caption box of the media editor; WhatsApp caps captions at CAPTION_MAX_LENGTH characters
+CAPTION_BOX_XPATH = '//div[@contenteditable="true"][@aria-label="Add a caption"]'
+CAPTION_MAX_LENGTH = 1024
+OUTGOING_MESSAGE_XPATH = '//div[@id="main"]//div[contains(@class, "message-out")]'
+# Clock icon on an outgoing bubble until the message/upload reached the server
+PENDING_ICON_XPATH = './/span[@data-icon="msg-time"]'
+
+# Every wait is a condition poll with its own timeout; None means "use wait_timeout".
+# Stages: switch (in-app chat switch), search (new-chat search), navigate (URL route),
+# compose (message box after an in-app switch), send_button, attach, file_input,
+# preview (media editor ready), confirm (outgoing bubble appeared) and upload (bubble
+# no longer pending, media can take a while).
+DEFAULT_STAGE_TIMEOUTS = {
+    "switch": 5,
+    "search": 5,
+    "navigate": None,
+    "compose": None,
+    "send_button": None,
+    "attach": None,
+    "file_input": 5,
+    "preview": None,
+    "confirm": 10,
+    "upload": 120,
+}
+# Chat-opening waits that time out as part of the normal fallback (link -> search -> URL)
+NAVIGATION_STAGES = ("switch", "search", "navigate")
+POLL_INTERVAL = 0.1
+
+# Clicks a wa.me link inside the React root so WhatsApp Web routes to the chat itself.
+# The window-level guard runs last and blocks a real page load if the app ignored the click.
+OPEN_CHAT_SCRIPT = """
+var root = document.getElementById('app') || document.body;
+var link = document.createElement('a');
+link.href = arguments[0];
+link.style.display = 'none';
+var guard = function (e) { e.preventDefault(); };
+window.addEventListener('click', guard);
+root.appendChild(link);
+link.click();
+window.removeEventListener('click', guard);
+link.remove();
+"""
+
+# insertText keeps emoji and line breaks intact, which send_keys does not
+INSERT_TEXT_SCRIPT = """
+arguments[0].focus();
+document.execCommand('insertText', false, arguments[1]);
+"""
+
+# ----------------------- WhatsAppBot Class (Modular & Enhanced) -----------------------
+class WhatsAppBot:
+    # `log` receives progress lines, `prompt(title, message)` is called when the
+    # user has to scan the QR code. Without a prompt the bot waits for the chat
+    # list to appear, which is what headless workers with a persistent profile need.
+    # `stage_timeouts` overrides entries of DEFAULT_STAGE_TIMEOUTS. Each wait's duration
+    # is kept in `stage_durations` and passed to `on_stage(stage, seconds, ok)` if given;
+    # callers set `part` (Text/Image/Video/File) to tell which part the waits belong to.
+    # `base_url` replaces web.whatsapp.com, e.g. with the local fake from fake_whatsapp.py.
+    # Every wait sleeps on `cancel_token`, so cancelling it aborts a send mid-wait
+    # with cancellation.Cancelled.
+    def __init__(self, browser_choice, wait_timeout, max_retries, persistent_session=False,
+                 headless=False, navigation="in_app", stage_timeouts=None, profile_dir=None,
+                 log=None, prompt=None, on_stage=None, base_url=None, cancel_token=None):
+        self.browser_choice = browser_choice
+        self.wait_timeout = wait_timeout
+        self.max_retries = max_retries
+        self.persistent_session = persistent_session
+        self.headless = headless
+        self.profile_dir = profile_dir
+        self.base_url = (base_url or WHATSAPP_URL).rstrip("/")
+        if navigation not in NAVIGATION_MODES:
+            raise ValueError(f"Unsupported navigation mode: {navigation}")
+        self.navigation = navigation
+        self.stage_timeouts = {stage: wait_timeout if timeout is None else timeout
+                               for stage, timeout in DEFAULT_STAGE_TIMEOUTS.items()}
+        self.stage_timeouts.update(stage_timeouts or {})
+        self.stage_durations = {}
+        self.on_stage = on_stage
+        self.part = ""
+        self.chat_number = None     # number whose chat is confirmed open, None when unsure
+        self.log = log or logging.info
+        self.prompt = prompt
+        self.cancel_token = cancel_token or CancelToken()
+        self.driver = None
+        self.init_driver()
+
+    def init_driver(self):
+        # The driver binary comes from the local cache; the network is only used on a cache miss
+        if self.browser_choice == "Chrome":
+            from selenium.webdriver.chrome.options import Options
+            options = Options()
+            if self.persistent_session:
+                options.add_argument(f"--user-data-dir={self.profile_dir or './chrome_profile'}")
+            if self.headless:
+                options.add_argument("--headless=new")
+            service = Service(resolve_driver("Chrome"))
+            self.driver = webdriver.Chrome(options=options, service=service)
+        elif self.browser_choice == "Firefox":
+            from selenium.webdriver.firefox.options import Options as FirefoxOptions
+            from selenium.webdriver.firefox.service import Service as FirefoxService
+            options = FirefoxOptions()
+            if self.persistent_session:
+                profile_path = self.profile_dir or "./firefox_profile"
+                if not os.path.exists(profile_path):
+                    os.makedirs(profile_path)
+                options.profile = webdriver.FirefoxProfile(profile_path)
+            if self.headless:
+                options.add_argument("-headless")
+            service = FirefoxService(resolve_driver("Firefox"))
+            self.driver = webdriver.Firefox(options=options, service=service)
+        else:
+            raise ValueError(f"Unsupported browser: {self.browser_choice}")
+        # No implicit wait: every lookup either probes (find_now) or waits on a condition (wait_for)
+        self.driver.implicitly_wait(0)
+
+    def is_driver_valid(self):
+        if self.driver is None:
+            return False
+        try:
+            _ = self.driver.title
+            return True
+        except WebDriverException:
+            return False
+
+    def ensure_driver(self):
+        if not self.is_driver_valid():
+            try:
+                if self.driver:
+                    self.driver.quit()
+            except Exception:
+                pass
+            self.init_driver()
+            self.driver.get(self.base_url)
+            self.wait_for_login("The browser was closed. A new browser has been opened.\nPlease scan the QR code again.")
+        return self.driver
+
+    def open_whatsapp(self):
+        self.driver.get(self.base_url)
+        self.wait_for_login("Please scan the QR code in the opened browser, then click OK to continue.")
+
+    def wait_for_login(self, message):
+        if self.prompt:
+            self.prompt("WhatsApp Login", message)
+            return
+        self.log("Waiting for WhatsApp Web login...")
+        try:
+            self.poll_until(EC.presence_of_element_located((By.XPATH, LOGGED_IN_XPATH)), LOGIN_TIMEOUT)
+        except TimeoutException:
+            self.log("WhatsApp Web login was not detected. Continuing anyway.")
+
+    def quit_driver(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+    # ----- Waiting -----
+    def find_now(self, xpath):
+        return self.driver.find_elements(By.XPATH, xpath)
+
+    def record_stage(self, stage, seconds, ok):
+        self.stage_durations[stage] = seconds
+        logging.debug(f"Stage {stage} {'done' if ok else 'timed out'} after {seconds:.2f}s")
+        if self.on_stage:
+            self.on_stage(stage, seconds, ok)
+
+    def poll_until(self, condition, timeout):
+        # Polls `condition(driver)` until it returns something truthy (a missing element
+        # counts as not yet). Raises TimeoutException after `timeout` seconds, Cancelled
+        # the moment the cancel token is set.
+        deadline = time.monotonic() + timeout
+        while True:
+            self.cancel_token.check()
+            try:
+                result = condition(self.driver)
+                if result:
+                    return result
+            except NoSuchElementException:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(f"Condition not met within {timeout}s")
+            self.cancel_token.sleep(min(POLL_INTERVAL, remaining))
+
+    def wait_for(self, stage, condition):
+        # poll_until with the stage's timeout; the duration is recorded either way
+        start = time.monotonic()
+        ok = False
+        try:
+            result = self.poll_until(condition, self.stage_timeouts[stage])
+            ok = True
+            return result
+        finally:
+            self.record_stage(stage, time.monotonic() - start, ok)
+
+    def outgoing_count(self):
+        return len(self.find_now(OUTGOING_MESSAGE_XPATH))
+
+    def wait_for_outgoing(self, previous_count, stage="confirm"):
+        self.wait_for(stage, lambda driver: self.outgoing_count() > previous_count)
+
+    def wait_until_delivered(self):
+        # Latest outgoing bubble has lost its clock icon: the upload finished
+        def delivered(driver):
+            bubbles = self.find_now(OUTGOING_MESSAGE_XPATH)
+            return bool(bubbles) and not bubbles[-1].find_elements(By.XPATH, PENDING_ICON_XPATH)
+        self.wait_for("upload", delivered)
+
+    # ----- Chat navigation -----
+    def app_loaded(self):
+        return bool(self.find_now(LOGGED_IN_XPATH))
+
+    def chat_state(self, old_main=None):
+        # "invalid" for the not-on-WhatsApp popup, "ok" once a (new) chat panel with a
+        # compose box is rendered, False while still switching
+        if self.find_now(INVALID_NUMBER_POPUP_XPATH):
+            return "invalid"
+        if old_main is not None:
+            try:
+                old_main.is_enabled()
+                return False
+            except WebDriverException:
+                pass
+        return "ok" if self.find_now(COMPOSE_BOX_XPATH) else False
+
+    def wait_for_chat_switch(self, old_main):
+        # The chat panel is re-rendered on every switch: wait for the old one to go stale
+        try:
+            return self.wait_for("switch", lambda driver: self.chat_state(old_main))
+        except Exception:
+            return None
+
+    def current_main_panel(self):
+        panels = self.find_now(MAIN_PANEL_XPATH)
+        return panels[0] if panels else None
+
+    def chat_is_for(self, number):
+        # True when the open chat's header or one of its message ids carries the number
+        digits = re.sub(r"\D", "", number)
+        for header in self.find_now(CHAT_HEADER_XPATH)[:1]:
+            if re.sub(r"\D", "", header.text) == digits:
+                return True
+        marker = f"_{digits}@"
+        return any(marker in (message.get_attribute("data-id") or "")
+                   for message in self.find_now(CHAT_MESSAGE_ID_XPATH))
+
+    def verify_chat(self, number, state):
+        # A link click or search hit may land on another chat; only "ok" once the open
+        # chat is confirmed to be the number's, None (fall back to the URL route) otherwise
+        if state != "ok":
+            return state
+        try:
+            self.poll_until(lambda driver: self.chat_is_for(number), CHAT_VERIFY_TIMEOUT)
+            self.chat_number = number
+            return "ok"
+        except TimeoutException:
+            self.log(f"Opened chat could not be confirmed as {number}")
+            return None
+
+    def open_chat_by_link(self, number):
+        old_main = self.current_main_panel()
+        self.driver.execute_script(OPEN_CHAT_SCRIPT, f"https://wa.me/{number.lstrip('+')}")
+        return self.verify_chat(number, self.wait_for_chat_switch(old_main))
+
+    def open_chat_by_search(self, number):
+        old_main = self.current_main_panel()
+        try:
+            self.wait_for("search", EC.element_to_be_clickable((By.XPATH, NEW_CHAT_XPATH))).click()
+            search_box = self.wait_for("search", EC.element_to_be_clickable((By.XPATH, NEW_CHAT_SEARCH_XPATH)))
+            search_box.send_keys(number.lstrip('+'))
+            # Pick the first hit once the contact search has rendered results
+            self.wait_for("search", EC.presence_of_element_located((By.XPATH, SEARCH_RESULT_XPATH)))
+            search_box.send_keys(Keys.ENTER)
+        except Exception:
+            return None
+        return self.verify_chat(number, self.wait_for_chat_switch(old_main))
+
+    def open_chat_by_url(self, number, message=""):
+        url = f"{self.base_url}/send?phone={number}"
+        if message:
+            url += f"&text={urllib.parse.quote(message)}"
+        self.driver.get(url)
+        try:
+            state = self.wait_for("navigate", lambda driver: self.chat_state())
+        except Exception:
+            return None
+        if state == "ok":
+            # The send route always opens the requested number's chat
+            self.chat_number = number
+        return state
+
+    def chat_open_for(self, number):
+        return self.chat_number == number or self.chat_is_for(number)
+
+    def open_chat(self, number, message=""):
+        # Returns "in_app" when the chat was switched without a reload (the message still
+        # has to be typed), "url" when the message was prefilled by the send URL, or
+        # "invalid" when WhatsApp reported the number as not on WhatsApp. A popup on an
+        # in-app switch leaves the previous chat open, so chat_number stays None.
+        self.chat_number = None
+        if self.navigation == "in_app" and self.app_loaded():
+            for method in (self.open_chat_by_link, self.open_chat_by_search):
+                try:
+                    result = method(number)
+                except WebDriverException:
+                    result = None
+                if result == "ok":
+                    return "in_app"
+                if result == "invalid":
+                    self.dismiss_popup()
+                    return "invalid"
+            self.log(f"In-app chat switch failed for {number}, reloading via URL")
+        if self.open_chat_by_url(number, message) == "invalid":
+            self.dismiss_popup()
+            return "invalid"
+        return "url"
+
+    def dismiss_popup(self):
+        try:
+            self.find_now(INVALID_NUMBER_POPUP_XPATH)[0].send_keys(Keys.ESCAPE)
+        except Exception:
+            pass
+
+    def type_message(self, message):
+        compose_box = self.wait_for("compose", EC.element_to_be_clickable((By.XPATH, COMPOSE_BOX_XPATH)))
+        self.driver.execute_script(INSERT_TEXT_SCRIPT, compose_box, message)
+
+    # ----- Sending -----
+    def send_text(self, number, message):
+        route = self.open_chat(number, message)
+        if route == "invalid":
+            self.log(f"{number} is not a valid WhatsApp number")
+            return False
+        if route == "in_app":
+            try:
+                self.type_message(message)
+            except Exception:
+                self.log(f"Could not type into the chat for {number}, reloading via URL")
+                self.open_chat_by_url(number, message)
+        clicked = False
+        delay = 1
+        for attempt in range(self.max_retries):
+            try:
+                before = self.outgoing_count()
+                send_button = self.wait_for("send_button", EC.element_to_be_clickable((By.XPATH, SEND_BUTTON_XPATH)))
+                send_button.click()
+                clicked = True
+                break
+            except Exception as e:
+                self.log(f"Text attempt {attempt+1} failed for {number}")
+                self.cancel_token.sleep(delay)
+                delay *= 2
+        if not clicked:
+            return False
+        # Past the click nothing is retried: a second attempt would send the message twice
+        try:
+            self.wait_for_outgoing(before)
+        except Exception:
+            self.log(f"Text message to {number} was not confirmed")
+            return False
+        self.log(f"Text message sent to {number}")
+        return True
+
+    def send_media(self, number, file_path, media_type, caption=""):
+        # With a caption the row's message goes out in the same bubble as the media
+        self.log(f"Sending {media_type} '{file_path}' to {number}{' with caption' if caption else ''}")
+        if not self.chat_open_for(number):
+            # Attaching now would upload into whichever chat is still open
+            self.log(f"{media_type} not sent: the open chat is not confirmed as {number}")
+            return False
+        clicked = False
+        delay = 1
+        for attempt in range(self.max_retries):
+            try:
+                before = self.outgoing_count()
+                attach_button = self.wait_for("attach", EC.presence_of_element_located((By.XPATH, ATTACH_BUTTON_XPATH)))
+                self.driver.execute_script("arguments[0].scrollIntoView(true);", attach_button)
+                self.wait_for("attach", EC.element_to_be_clickable((By.XPATH, ATTACH_BUTTON_XPATH))).click()
+                file_input = self.wait_for("file_input", EC.presence_of_element_located((By.XPATH, FILE_INPUT_XPATH)))
+                file_input.send_keys(os.path.abspath(file_path))
+                if caption:
+                    caption_box = self.wait_for("preview", EC.element_to_be_clickable((By.XPATH, CAPTION_BOX_XPATH)))
+                    self.driver.execute_script(INSERT_TEXT_SCRIPT, caption_box, caption)
+                # The media editor's send button only becomes clickable once the preview rendered
+                send_button = self.wait_for("preview", EC.element_to_be_clickable((By.XPATH, SEND_BUTTON_XPATH)))
+                send_button.click()
+                clicked = True
+                break
+            except Exception as e:
+                self.log(f"{media_type} attempt {attempt+1} failed for {number}")
+                self.cancel_token.sleep(delay)
+                delay *= 2
+        if not clicked:
+            return False
+        # As in send_text, a slow confirm or upload is reported, never re-sent
+        try:
+            self.wait_for_outgoing(before)
+            self.wait_until_delivered()
+        except Exception:
+            self.log(f"{media_type} to {number} was not confirmed as delivered")
+            return False
+        self.log(f"{media_type} sent to {number}")
+        return True